@@ -0,0 +1,28 @@
+import time
+
+from django.core.cache import caches
+
+
+def versions():
+    """
+    The cache holding the version keys, apart from the bulk entries so
+    culling them never evicts a version.
+    """
+    return caches["versions"]
+
+
+def get_version(key):
+    """
+    Returns the version stored under key, starting a new one if it is
+    missing. Versions are never reused: a lost key yields a version no
+    cached entry or client ETag was made for.
+    """
+    version = versions().get(key)
+    if version is None:
+        versions().add(key, time.time_ns(), None)
+        version = versions().get(key)
+    return version
+
+
+def bump_version(key):
+    versions().set(key, time.time_ns(), None)
@@ -1,2 +1,3 @@
 from apps.meals.apis.meals import MealAPIView
 from apps.meals.apis.meals import MealCategoryAPIView
+from apps.meals.apis.menu import MenuSnapshotAPIView
@@ -1,28 +1,68 @@
 from django.conf import settings
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.utils.http import quote_etag
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.generics import ListAPIView
+from rest_framework.renderers import JSONRenderer
 
+from apps.meals.cache import menu_cache_key
+from apps.meals.cache import menu_version
 from apps.meals.models import Meal
 from apps.meals.models import MealCategory
 from apps.meals.serializers import MealSerializer
 from apps.meals.serializers import MealCategorySerializer
 
 
-class MealCategoryAPIView(ListAPIView):
+class CachedMenuMixin:
+    """
+    Serves a menu list from the cache, rendered once per menu version.
+    The ETag follows the version, so a tablet holding the current menu
+    gets a 304 without the list being loaded or rendered. Views without
+    a menu name are served uncached.
+    """
+    menu_name = None
+
+    def get_menu_name(self):
+        return self.menu_name
+
+    def get(self, request, *args, **kwargs):
+        name = self.get_menu_name()
+        if name is None:
+            return super().get(request, *args, **kwargs)
+
+        version = menu_version()
+        etag = quote_etag(f"{version}-{name}")
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            key = menu_cache_key(version, name)
+            content = cache.get(key)
+            if content is None:
+                content = JSONRenderer().render(
+                    super().get(request, *args, **kwargs).data)
+                cache.set(key, content, settings.MENU_CACHE_TIME_IN_SECONDS)
+            response = HttpResponse(content, content_type="application/json")
+
+        response["ETag"] = etag
+        # Tablets may keep the menu but must revalidate it before use
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+class MealCategoryAPIView(CachedMenuMixin, ListAPIView):
     model = MealCategory
     serializer_class = MealCategorySerializer
     queryset = MealCategory.objects.all()
+    menu_name = "categories"
 
-    @method_decorator(cache_page(settings.CACHE_TIME_IN_SECONDS))
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
 
-
-class MealAPIView(ListAPIView):
+class MealAPIView(CachedMenuMixin, ListAPIView):
     model = Meal
     serializer_class = MealSerializer
 
@@ -34,11 +74,16 @@ class MealAPIView(ListAPIView):
         type=openapi.TYPE_INTEGER
     )
 
-    @method_decorator(cache_page(settings.CACHE_TIME_IN_SECONDS))
     @swagger_auto_schema(manual_parameters=[meal_category_id_param])
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def get_menu_name(self):
+        meal_category_id = self.request.GET.get("meal_category_id", "0") or "0"
+        if not meal_category_id.isdigit():
+            return None
+        return f"meals:{int(meal_category_id)}"
+
     def get_queryset(self):
         meal_category_id = self.request.GET.get("meal_category_id", 0)
         if meal_category_id:
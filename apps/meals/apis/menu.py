@@ -0,0 +1,57 @@
+import gzip
+
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.utils.http import quote_etag
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.views import APIView
+
+from apps.meals.cache import compressed_menu
+from apps.meals.cache import menu_version
+
+
+class MenuSnapshotAPIView(APIView):
+
+    since_param = openapi.Parameter(
+        'since',
+        openapi.IN_QUERY,
+        description="Version the client already holds; only the changes since it are returned",
+        type=openapi.TYPE_STRING
+    )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "The whole menu in one payload: categories with their meals and the "
+            "meals without a category. With `since`, only the changed and deleted "
+            "categories and meals, unless that version is no longer known "
+            "(`full` is then true). Gzipped when the client accepts it."
+        ),
+        manual_parameters=[since_param],
+        responses={200: 'Menu snapshot or delta', 304: 'Menu not modified'}
+    )
+    def get(self, request):
+        version = menu_version()
+        since = request.GET.get("since", "")
+        if not since.isdigit():
+            since = None
+
+        etag = quote_etag(f"{version}-menu-{since or 'full'}")
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            content = compressed_menu(version, since)
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                response = HttpResponse(content, content_type="application/json")
+                response["Content-Encoding"] = "gzip"
+            else:
+                response = HttpResponse(
+                    gzip.decompress(content), content_type="application/json")
+
+        response["ETag"] = etag
+        response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = "no-cache"
+        return response
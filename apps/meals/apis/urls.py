@@ -1,8 +1,10 @@
 from django.urls import path
 from apps.meals.apis import MealCategoryAPIView
 from apps.meals.apis import MealAPIView
+from apps.meals.apis import MenuSnapshotAPIView
 
 urlpatterns = [
     path("categories/", MealCategoryAPIView.as_view()),
     path("meals/", MealAPIView.as_view()),
+    path("menu/", MenuSnapshotAPIView.as_view()),
 ]
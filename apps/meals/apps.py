@@ -5,3 +5,7 @@ class MealsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.meals'
     verbose_name = "Yemək"
+
+    def ready(self) -> None:
+        import apps.meals.signals
+        return super().ready()
@@ -0,0 +1,130 @@
+import gzip
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from apps.commons.versions import bump_version
+from apps.commons.versions import get_version
+from apps.meals.models import Meal
+from apps.meals.models import MealCategory
+from apps.meals.serializers import MealCategorySerializer
+from apps.meals.serializers import MenuMealSerializer
+
+
+MENU_VERSION_KEY = "menu:version"
+
+
+def menu_version():
+    """
+    Changes whenever a meal or a category changes. A version is never
+    reused, so an ETag handed out before a cache flush cannot match a newer
+    menu.
+    """
+    return get_version(MENU_VERSION_KEY)
+
+
+def invalidate_menu():
+    bump_version(MENU_VERSION_KEY)
+
+
+def menu_cache_key(version, name):
+    return f"menu:{version}:{name}"
+
+
+def menu_snapshot(version):
+    """
+    The whole menu as of the version: the categories with their meals and
+    the meals without a category. Snapshots stay cached for
+    MENU_CACHE_TIME_IN_SECONDS after their version is replaced, so deltas
+    can be computed against them.
+    """
+    key = menu_cache_key(version, "snapshot")
+    snapshot = cache.get(key)
+    if snapshot is None:
+        categories = MealCategorySerializer(
+            MealCategory.objects.order_by("id"), many=True).data
+        meals = MenuMealSerializer(Meal.objects.order_by("id"), many=True).data
+
+        category_meals = {category["id"]: [] for category in categories}
+        uncategorized = []
+        for meal in meals:
+            category_meals.get(meal["category_id"], uncategorized).append(meal)
+        snapshot = {
+            # A string, as JavaScript clients would round a nanosecond integer
+            "version": str(version),
+            "categories": [
+                {**category, "meals": category_meals[category["id"]]}
+                for category in categories
+            ],
+            "uncategorized": uncategorized,
+        }
+        cache.set(key, snapshot, settings.MENU_CACHE_TIME_IN_SECONDS)
+    return snapshot
+
+
+def flatten_snapshot(snapshot):
+    """Maps the categories and meals of a snapshot by id."""
+    categories, meals = {}, {}
+    for category in snapshot["categories"]:
+        categories[category["id"]] = {
+            key: value for key, value in category.items() if key != "meals"}
+        for meal in category["meals"]:
+            meals[meal["id"]] = meal
+    for meal in snapshot["uncategorized"]:
+        meals[meal["id"]] = meal
+    return categories, meals
+
+
+def menu_delta(since, version):
+    """
+    The changes between two snapshots: the added or changed categories and
+    meals, and the ids of the deleted ones. None if the older snapshot is
+    no longer cached.
+    """
+    old = cache.get(menu_cache_key(since, "snapshot"))
+    if old is None:
+        return None
+    old_categories, old_meals = flatten_snapshot(old)
+    new_categories, new_meals = flatten_snapshot(menu_snapshot(version))
+    return {
+        "version": str(version),
+        "since": str(since),
+        "full": False,
+        "categories": [
+            category for category_id, category in new_categories.items()
+            if old_categories.get(category_id) != category
+        ],
+        "meals": [
+            meal for meal_id, meal in new_meals.items()
+            if old_meals.get(meal_id) != meal
+        ],
+        "deleted_categories": [
+            category_id for category_id in old_categories
+            if category_id not in new_categories
+        ],
+        "deleted_meals": [
+            meal_id for meal_id in old_meals if meal_id not in new_meals
+        ],
+    }
+
+
+def compressed_menu(version, since=None):
+    """
+    The gzipped JSON of the snapshot of the version, or of its delta from
+    an older version when that one is still known. Rendered once per pair;
+    unknown versions get the full snapshot, so they add no cache entries.
+    """
+    if since and cache.get(menu_cache_key(since, "snapshot")) is None:
+        since = None
+    key = menu_cache_key(version, f"delta:{since}" if since else "full")
+    content = cache.get(key)
+    if content is None:
+        data = menu_delta(since, version) if since else None
+        if data is None:
+            # The older snapshot expired in the meantime
+            key = menu_cache_key(version, "full")
+            data = {**menu_snapshot(version), "full": True}
+        content = gzip.compress(JSONRenderer().render(data))
+        cache.set(key, content, settings.MENU_CACHE_TIME_IN_SECONDS)
+    return content
@@ -1,2 +1,3 @@
 from apps.meals.serializers.meals import MealCategorySerializer
 from apps.meals.serializers.meals import MealSerializer
+from apps.meals.serializers.meals import MenuMealSerializer
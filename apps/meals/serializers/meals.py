@@ -23,3 +23,8 @@ class MealSerializer(serializers.ModelSerializer):
             "description",
             "price"
         )
+
+
+class MenuMealSerializer(MealSerializer):
+    class Meta(MealSerializer.Meta):
+        fields = MealSerializer.Meta.fields + ("category_id",)
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.meals.cache import invalidate_menu
+from apps.meals.models import Meal
+from apps.meals.models import MealCategory
+
+
+@receiver(post_save, sender=Meal)
+@receiver(post_delete, sender=Meal)
+@receiver(post_save, sender=MealCategory)
+@receiver(post_delete, sender=MealCategory)
+def invalidate_menu_on_change(sender, instance, *args, **kwargs):
+    # Tablets must not cache the old menu again before the change commits
+    transaction.on_commit(invalidate_menu)
@@ -1,3 +1,4 @@
 from apps.orders.admin.histories import HistoricalOrderAdmin
 from apps.orders.admin.orders import OrderAdmin
 from apps.orders.admin.statistics import StatisticsAdmin
+from apps.orders.admin.print_jobs import PrintJobAdmin
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from django.db.models import Subquery
-from django.db.models import OuterRef
+from django.db.models import F
 from django.db.models import Sum
+from django.db.models import Window
+from django.db.models.functions import RowNumber
 
 from rangefilter.filters import DateRangeFilter
 from simple_history.utils import get_history_model_for_model
@@ -59,20 +60,32 @@ class HistoricalOrderItemAdmin(admin.ModelAdmin):
         ('created_at', DateRangeFilter)
     ]
 
+    @staticmethod
+    def latest_snapshots(queryset):
+        """
+        Narrows history rows to the latest snapshot of each order item,
+        ignoring snapshots flagged as deleted by an administrator. A window
+        ranks the snapshots of every item in one pass over the history.
+        """
+        latest = queryset.exclude(
+            is_deleted_by_adminstrator=True
+        ).order_by().annotate(
+            snapshot_rank=Window(
+                RowNumber(),
+                partition_by=[F('id')],
+                order_by=[F('history_date').desc(), F('history_id').desc()],
+            )
+        ).filter(snapshot_rank=1)
+        return queryset.model.objects.filter(
+            history_id__in=latest.values('history_id'))
+
     def changelist_view(self, request, extra_context=None):
         response = super().changelist_view(request, extra_context)
         try:
             queryset = response.context_data['cl'].queryset
 
-            # Create a subquery to get the latest history_date for each id
-            subquery = queryset.exclude(is_deleted_by_adminstrator=True).filter(id=OuterRef('id')).order_by(
-                '-history_date').values('history_date')[:1]
-
-            # Filter the queryset to include only the latest records
-            latest_records = queryset.filter(history_date=Subquery(subquery))
-
-            # Perform the aggregation on the filtered queryset
-            aggregated_data = latest_records.aggregate(
+            # Perform the aggregation on the latest snapshot of each item
+            aggregated_data = self.latest_snapshots(queryset).aggregate(
                 total_quantity=Sum('quantity'),
                 total_price=Sum('price')
             )
@@ -3,6 +3,7 @@ from django.contrib import admin
 from simple_history.admin import SimpleHistoryAdmin
 from apps.orders.models import Order
 from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
 
 
 # Register the Order model with SimpleHistoryAdmin
@@ -39,6 +40,20 @@ class OrderAdmin(SimpleHistoryAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('table', 'waitress')
 
+    def save_model(self, request, obj, form, change):
+        previous_table_id = form.initial.get('table') if change else None
+        super().save_model(request, obj, form, change)
+        TableOccupancy.objects.refresh(obj.table_id, previous_table_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        TableOccupancy.objects.refresh(obj.table_id)
+
+    def delete_queryset(self, request, queryset):
+        table_ids = set(queryset.values_list('table_id', flat=True))
+        super().delete_queryset(request, queryset)
+        TableOccupancy.objects.refresh(*table_ids)
+
 
 # Register the OrderItem model
 
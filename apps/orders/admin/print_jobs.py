@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from apps.orders.models import PrintJob
+
+
+@admin.register(PrintJob)
+class PrintJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'table',
+        'kind',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'printed_at',
+        'created_at',
+    )
+    list_filter = ('status', 'kind')
+    list_select_related = ('table__room',)
+    readonly_fields = ('order_ids', 'attempts', 'printed_at', 'last_error')
+    ordering = ('-id',)
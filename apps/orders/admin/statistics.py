@@ -1,6 +1,11 @@
+import calendar
+import datetime
+
 from simple_history.admin import SimpleHistoryAdmin
 
+from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
 from django.db.models import Sum
 from django.db.models import Min
 from django.db.models import Max
@@ -9,9 +14,12 @@ from django.http import HttpRequest, HttpResponseRedirect
 from django.http import JsonResponse
 from django.utils.dateformat import format
 from django.utils.timezone import localtime
-from django.utils.html import format_html
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 
-from apps.orders.apis.printer import PrinterService
+from apps.orders.models import PrintJob
+from apps.orders.models import SalesFact
+from apps.orders.models import TableOccupancy
 from apps.orders.models import Statistics
 from apps.orders.models import Order
 from apps.orders.models import OrderItem
@@ -134,21 +142,11 @@ class StatisticsAdmin(SimpleHistoryAdmin):
 
     def z_check(self, obj):
         Statistics.objects.delete_orders_for_statistics_day(obj.date)
-        try:
-            PrinterService().send_to_printer(text=obj.print_check)
-        except Exception as e:
-            print("Exception", e)
-            return False
-        return True
+        return PrintJob.objects.enqueue(obj.print_check)
 
     def z_check_till_now(self, obj):
         obj.delete_orders_till_now()
-        try:
-            PrinterService().send_to_printer(text=obj.print_check)
-        except Exception as e:
-            print("Exception", e)
-            return False
-        return True
+        return PrintJob.objects.enqueue(obj.print_check)
 
     def response_change(self, request, obj):
         if "_z-cek" in request.POST:
@@ -167,8 +165,8 @@ class StatisticsAdmin(SimpleHistoryAdmin):
     def active_orders(self, request):
         paid_orders_sum = Order.objects.filter(is_paid=True).aggregate(
             total_paid=Sum('total_price'))['total_paid']
-        unpaid_orders_sum = Order.objects.filter(is_paid=False).aggregate(
-            total_unpaid=Sum('total_price'))['total_unpaid']
+        unpaid_orders_sum = TableOccupancy.objects.aggregate(
+            total_unpaid=Sum('open_total'))['total_unpaid']
 
         return JsonResponse({
             'total_paid': paid_orders_sum or 0,
@@ -183,163 +181,115 @@ class StatisticsAdmin(SimpleHistoryAdmin):
 
         return super().change_view(request, object_id, form_url, extra_context=extra_context)
 
-    def display_per_waitress(self, obj):
-        # Get all orders related to this statistic
-        orders = Order.objects.all_orders().filter(statistics=obj)
-
-        # Get the oldest and latest created_at dates
-        order_dates = orders.aggregate(
-            oldest_order=Min('created_at'),
-            latest_order=Max('created_at')
-        )
-
-        oldest_order = order_dates['oldest_order']
-        latest_order = order_dates['latest_order']
-
-        # Group by waitress and sum the total_price
-        waitress_totals = orders.values('waitress__first_name', 'waitress__last_name').annotate(
-            total_served=Sum('total_price')
-        )
-        return self.create_table_for_per_waitress(waitress_totals, oldest_order, latest_order)
-
-    def display_order_items(self, obj):
-        # Get all orders related to this statistic
-        orders = Order.objects.all_orders().filter(statistics=obj)
-
-        # Get the oldest and latest created_at dates
-        order_dates = orders.aggregate(
-            oldest_order=Min('created_at'),
-            latest_order=Max('created_at')
-        )
-
-        oldest_order = order_dates['oldest_order']
-        latest_order = order_dates['latest_order']
-
-        # Get all order items related to these orders
-        order_items = OrderItem.objects.all_order_items().filter(order__in=orders)
-        order_items = order_items.values('meal__name').annotate(
-            total_quantity=Sum('quantity')
-        ).annotate(total_price=Sum('price'))
-
-        if not order_items.exists():
-            return "No orders found."
-        return self.create_table_for_order_items(order_items, oldest_order, latest_order)
-
-    def create_table_for_per_waitress(self, waitress_totals, oldest_order, latest_order):
-        # Format dates to include time (hours and minutes)
-        oldest_order_str = oldest_order.strftime('%d %B %Y, %H:%M')
-        latest_order_str = latest_order.strftime('%d %B %Y, %H:%M')
-
-        # Styled help text
-        help_text_html = f"""
-        <small style="display: block; font-size: 0.9rem; color: #666; margin-bottom: 10px;">
-            <span> Hər ofisiantın xidmət etdiyi sifarişlərin cəm məbləğidir.
-            <br>
-            *<span style="font-weight: bold;">{oldest_order_str}</span> tarixdən <span style="font-weight: bold;">{latest_order_str}</span> tarixədək</span>
-        </small>
+    def sales_facts(self, obj):
+        """
+        Returns the pre-summed sales facts of a daily, monthly, yearly or
+        per-waitress statistic with the bounds of its period, or None for
+        reports built from linked orders.
         """
+        if obj.title == "till_now":
+            return None
+
+        start = end = obj.date
+        if obj.title == "monthly":
+            start = obj.date.replace(day=1)
+            end = start.replace(
+                day=calendar.monthrange(start.year, start.month)[1])
+        elif obj.title == "yearly":
+            start = obj.date.replace(month=1, day=1)
+            end = obj.date.replace(month=12, day=31)
+
+        facts = SalesFact.objects.for_period(start, end)
+        if obj.title == "per_waitress" and obj.waitress_info:
+            facts = facts.filter(
+                waitress__username=obj.waitress_info.split(" - ")[0])
+        return (
+            facts,
+            datetime.datetime.combine(start, datetime.time.min),
+            datetime.datetime.combine(end, datetime.time.max),
+        )
 
-        # Start building the table
-        table_html = """
-        <hr>
-        <table class='table table-striped' style="border-collapse: collapse; width: 100%; margin-top: 20px; box-shadow: 0px 0px 10px rgba(0, 0, 0, 0.1);">
-            <caption style="caption-side: top; text-align: center; font-weight: bold; font-size: 1.5rem; padding-bottom: 8px; color: #444;">
-                Ofisiantların xidməti
-            </caption>
-            <thead style="background-color: #f2f2f2;">
-                <tr>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">#</th>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">Ofisiant</th>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">Ümumi Məbləğ</th>
-                </tr>
-            </thead>
-            <tbody>
+    def cached_report(self, obj, name):
         """
-        total_server_by_waitresses = 0
-        # Iterate through each waitress and display their total served amount
-        for index, waitress in enumerate(waitress_totals, start=1):
-            waitress_name = f"{waitress['waitress__first_name']} {waitress['waitress__last_name']}" or "Məlum deyil"
-            total_served = waitress['total_served'] or 0
-            total_server_by_waitresses += float(total_served)
-            table_html += f"""
-                <tr style="background-color: {'#ffffff' if index % 2 == 0 else '#f9f9f9'};">
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{index}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{waitress_name}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{total_served} (AZN)</td>
-                </tr>
-            """
-        # Adding total row at the end
-        table_html += f"""
-            <tr style="font-weight: bold; background-color: #e6e6e6;">
-                <td style="padding: 10px; border-bottom: 1px solid #ddd;">Cəmi</td>
-                <td></td>
-                <td style="padding: 10px; border-bottom: 1px solid #ddd;">{total_server_by_waitresses} (AZN)</td>
-            </tr>
+        Returns the rendered report fragment of the statistic from the
+        cache, rendering it on a miss. The key follows the statistic's
+        report version, so it changes with the orders behind it.
         """
-
-        table_html += "</tbody></table> <br>"
-        table_html += help_text_html
-        return format_html(table_html)
-
-    def create_table_for_order_items(self, order_items, oldest_order, latest_order):
-        # Format dates to include time (hours and minutes)
-        oldest_order_str = oldest_order.strftime('%d %B %Y, %H:%M')
-        latest_order_str = latest_order.strftime('%d %B %Y, %H:%M')
-
-        # Styled help text
-        help_text_html = f"""
-        <small style="display: block; font-size: 0.9rem; color: #666; margin-bottom: 10px;">
-            <span> Sifarişlər <span style="font-weight: bold;">{oldest_order_str}</span> tarixdən <span style="font-weight: bold;">{latest_order_str}</span> tarixədək satılıb.</span>
-        </small>
+        key = f"statistics:{obj.id}:{name}:{obj.report_cache_version}"
+        html = cache.get(key)
+        if html is None:
+            context = self.report_context(obj)
+            if context is None:
+                html = "No orders found."
+            else:
+                html = render_to_string(
+                    f"admin/orders/statistics/{name}_table.html", context)
+            cache.set(key, html, settings.REPORT_CACHE_TIME_IN_SECONDS)
+        return mark_safe(html)
+
+    def report_context(self, obj):
         """
-
-        # Start building the table
-        table_html = """
-        <hr>
-        <table class='table table-striped' style="border-collapse: collapse; width: 100%; margin-top: 20px; box-shadow: 0px 0px 10px rgba(0, 0, 0, 0.1);">
-            <caption style="caption-side: top; text-align: center; font-weight: bold; font-size: 1.5rem; padding-bottom: 8px; color: #444;">
-                Satılmış Məhsullar
-            </caption>
-            <thead style="background-color: #f2f2f2;">
-                <tr>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">#</th>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">Məhsul</th>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">Miqdar</th>
-                    <th style="padding: 10px; border-bottom: 1px solid #ddd;">Qiymət</th>
-                </tr>
-            </thead>
-            <tbody>
+        Computes the date bounds, per-meal totals and per-waitress totals
+        of a statistic once and keeps them on the instance, so both report
+        fields of the change form share them. Returns None when the
+        statistic has no sales.
         """
+        if not hasattr(obj, "_report_context"):
+            obj._report_context = self.build_report_context(obj)
+        return obj._report_context
+
+    def build_report_context(self, obj):
+        period = self.sales_facts(obj)
+        if period:
+            facts, oldest_order, latest_order = period
+            order_items = list(facts.values('meal__name').annotate(
+                total_quantity=Sum('quantity'),
+                total_price=Sum('revenue'),
+            ).order_by())
+            waitress_totals = list(facts.values(
+                'waitress__first_name', 'waitress__last_name'
+            ).annotate(total_served=Sum('revenue')).order_by())
+        else:
+            orders = Order.objects.all_orders().filter(statistics=obj)
+            # The date bounds come with the per-waitress grouping
+            waitress_totals = list(orders.values(
+                'waitress__first_name', 'waitress__last_name'
+            ).annotate(
+                total_served=Sum('total_price'),
+                oldest_order=Min('created_at'),
+                latest_order=Max('created_at'),
+            ).order_by())
+            order_items = list(OrderItem.objects.all_order_items().filter(
+                order__statistics=obj
+            ).values('meal__name').annotate(
+                total_quantity=Sum('quantity'),
+                total_price=Sum('price'),
+            ).order_by())
+            if waitress_totals:
+                oldest_order = min(row['oldest_order'] for row in waitress_totals)
+                latest_order = max(row['latest_order'] for row in waitress_totals)
+
+        if not order_items and not waitress_totals:
+            return None
+
+        return {
+            "oldest_order": oldest_order,
+            "latest_order": latest_order,
+            "order_items": order_items,
+            "total_quantity": sum(
+                item["total_quantity"] or 0 for item in order_items),
+            "total_price": sum(
+                item["total_price"] or 0 for item in order_items),
+            "waitress_totals": waitress_totals,
+            "total_served": sum(
+                waitress["total_served"] or 0 for waitress in waitress_totals),
+        }
 
-        total_price, total_quantity = 0, 0
-        for index, item in enumerate(order_items, start=1):
-            # Summing total price and quantity
-            total_price += float(item["total_price"])
-            total_quantity += int(item["total_quantity"])
-
-            # Adding numbered rows
-            table_html += f"""
-                <tr style="background-color: {'#ffffff' if index % 2 == 0 else '#f9f9f9'};">
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{index}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{item["meal__name"]}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{item["total_quantity"]}</td>
-                    <td style="padding: 10px; border-bottom: 1px solid #ddd;">{item["total_price"]} (AZN)</td>
-                </tr>
-            """
-
-        # Adding total row at the end
-        table_html += f"""
-            <tr style="font-weight: bold; background-color: #e6e6e6;">
-                <td style="padding: 10px; border-bottom: 1px solid #ddd;">Cəmi</td>
-                <td></td>
-                <td style="padding: 10px; border-bottom: 1px solid #ddd;">{total_quantity}</td>
-                <td style="padding: 10px; border-bottom: 1px solid #ddd;">{total_price} (AZN)</td>
-            </tr>
-        """
+    def display_per_waitress(self, obj):
+        return self.cached_report(obj, "per_waitress")
 
-        table_html += "</tbody></table> <br>"
-        table_html += help_text_html
-        return format_html(table_html)
+    def display_order_items(self, obj):
+        return self.cached_report(obj, "order_items")
 
     def title_with_date(self, obj):
         formatted_date = format(obj.date, 'j F')
@@ -1,7 +1,9 @@
 
 from apps.orders.apis.order_items.add import AddOrderItemAPIView
+from apps.orders.apis.order_items.add_multiple import AddMultipleOrderItemsAPIView
 from apps.orders.apis.order_items.list import ListOrderItemsAPIView
 from apps.orders.apis.order_items.remove import DeleteOrderItemAPIView
+from apps.orders.apis.order_items.remove_multiple import DeleteMultipleOrderItemsAPIView
 
 from apps.orders.apis.orders.create import CreateOrderAPIView
 from apps.orders.apis.orders.check import CheckOrderAPIView
@@ -13,5 +15,5 @@ from apps.orders.apis.orders.waitress_list import ListWaitressAPIView
 from apps.orders.apis.orders.waitress_change import ChangeWaitressAPIView
 
 from apps.orders.apis.printer import PrintCheckAPIView
-
-# from apps.orders.apis.order_items. import AddMultipleOrderItemsAPIView
+from apps.orders.apis.print_jobs import PrintJobAPIView
+from apps.orders.apis.print_jobs import ListTablePrintJobsAPIView
@@ -15,6 +15,7 @@ from rest_framework.views import APIView
 
 from apps.meals.models import Meal
 from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
 from apps.orders.models.order import Order
 from apps.orders.serializers import OrderItemSerializer
 from apps.tables.models import Table
@@ -51,16 +52,21 @@ class AddOrderItemAPIView(APIView):
                     return Response({'error': 'Meal not found'}, status=HTTP_404_NOT_FOUND)
 
                 response = self.handle_order_item(order, meal)
-                order.update_total_price()
+                if response.status_code != HTTP_200_OK:
+                    # Nothing was added, so the totals stay as they are
+                    return response
+                order.add_to_total_price(meal.price)
+                TableOccupancy.objects.add_to_open_total(
+                    order.table_id, meal.price)
                 return response
         except Exception as e:
             return Response({'error': str(e)}, status=HTTP_500_INTERNAL_SERVER_ERROR)
 
     def get_order(self, request, table_id, order_id):
         table = Table.objects.filter(id=table_id).first()
-        order: Order = table.current_order \
-            if not order_id else \
-            table.current_orders.filter(id=order_id).first()
+        order: Order = table.get_open_order(order_id) if table else None
+        if not order:
+            return None
 
         if request.user.type in ["admin", 'captain_waitress', 'restaurant'] or order.waitress == request.user:
             return order
@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from drf_yasg.utils import swagger_auto_schema
+from simple_history.utils import bulk_create_with_history
+from simple_history.utils import bulk_update_with_history
+
+from django.db import transaction
+from django.utils import timezone
+
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_404_NOT_FOUND
+
+from rest_framework.response import Response
+
+from apps.meals.models import Meal
+from apps.orders.apis.order_items.add import AddOrderItemAPIView
+from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
+from apps.orders.serializers import OrderItemsInputSerializer
+from apps.orders.serializers import OrderItemOutputSerializer
+
+
+class AddMultipleOrderItemsAPIView(AddOrderItemAPIView):
+
+    @swagger_auto_schema(
+        operation_description="Add a round of items to an existing unpaid order for the specified table.",
+        request_body=OrderItemsInputSerializer,
+        responses={
+            200: OrderItemOutputSerializer(many=True),
+            404: 'Order or meal not found, or payment already made',
+            400: 'Invalid data'
+        }
+    )
+    def post(self, request, table_id):
+        serializer = OrderItemsInputSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
+
+        # Merge repeated meals into a single line
+        quantities = defaultdict(int)
+        for item in serializer.validated_data["items"]:
+            quantities[item["meal_id"]] += item["quantity"]
+
+        with transaction.atomic():
+            order = self.get_order(
+                request, table_id, serializer.validated_data.get("order_id"))
+            if not order:
+                return Response({
+                    'error': 'Order not found or payment has been made already.'},
+                    status=HTTP_404_NOT_FOUND
+                )
+
+            meals = Meal.objects.in_bulk(list(quantities))
+            missing_meal_ids = [
+                meal_id for meal_id in quantities if meal_id not in meals]
+            if missing_meal_ids:
+                return Response(
+                    {'error': 'Meal not found', 'meal_ids': missing_meal_ids},
+                    status=HTTP_404_NOT_FOUND
+                )
+
+            order_items = {}
+            for order_item in order.order_items.select_for_update().filter(
+                meal_id__in=list(quantities)
+            ).order_by("id"):
+                order_items.setdefault(order_item.meal_id, order_item)
+
+            now = timezone.now()
+            to_create, to_update, added_price = [], [], 0
+            for meal_id, quantity in quantities.items():
+                price = meals[meal_id].price * quantity
+                added_price += price
+
+                order_item = order_items.get(meal_id)
+                if order_item:
+                    order_item.quantity += quantity
+                    order_item.price += price
+                    order_item.item_added_at = now
+                    order_item.updated_at = now
+                    to_update.append(order_item)
+                else:
+                    order_item = OrderItem(
+                        meal_id=meal_id,
+                        order=order,
+                        price=price,
+                        quantity=quantity,
+                    )
+                    order_items[meal_id] = order_item
+                    to_create.append(order_item)
+
+            if to_update:
+                bulk_update_with_history(
+                    to_update,
+                    OrderItem,
+                    ['quantity', 'price', 'item_added_at', 'updated_at'],
+                    default_user=request.user,
+                )
+            if to_create:
+                bulk_create_with_history(
+                    to_create, OrderItem, default_user=request.user)
+
+            order.add_to_total_price(added_price)
+            TableOccupancy.objects.add_to_open_total(
+                order.table_id, added_price)
+
+        output = OrderItemOutputSerializer(
+            [order_items[meal_id] for meal_id in quantities], many=True)
+        return Response(output.data, status=HTTP_200_OK)
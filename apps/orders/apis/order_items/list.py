@@ -29,12 +29,13 @@ class ListOrderItemsAPIView(ListAPIView):
             return OrderItem.objects.none()
 
         order_id = self.request.GET.get("order_id", default_order_id)
-        order = table.current_orders.filter(id=order_id).first()
+        order = table.get_open_order(order_id)
         if not order:
             return OrderItem.objects.none()
+        order_items = order.order_items.select_related('meal')
         if self.request.user.type == "waitress":
-            return order.order_items.order_by('-item_added_at').all()
-        return order.order_items.all()
+            return order_items.order_by('-item_added_at')
+        return order_items
 
     @swagger_auto_schema(
         manual_parameters=[
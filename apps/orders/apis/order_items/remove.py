@@ -1,16 +1,19 @@
-from rest_framework.views import APIView
-from django.db.models import Sum
 from decimal import Decimal
-from django.db import models
+
+from rest_framework.views import APIView
+from django.db import transaction
+from django.utils import timezone
 
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
 from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
 
 
 from drf_yasg.utils import swagger_auto_schema
+from simple_history.utils import bulk_update_with_history
 
 from apps.orders.models import Order
 from apps.orders.serializers import DeleteOrderItemSerializer
@@ -23,7 +26,7 @@ class DeleteOrderItemAPIView(APIView):
     permission_classes = [IsAuthenticated, IsRestaurantOwner]
 
     @swagger_auto_schema(
-        operation_description="Decrease the quantity or delete an item from an existing unpaid order for the specified table.",
+        operation_description="Decrease the quantity (1 by default) or delete an item from an existing unpaid order for the specified table.",
         request_body=DeleteOrderItemSerializer,
         responses={
             204: 'Item quantity updated or item deleted successfully',
@@ -42,7 +45,19 @@ class DeleteOrderItemAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        meal_id = request.data.get("meal_id", 0)
+        try:
+            meal_id = int(request.data.get("meal_id", 0))
+            quantity = int(request.data.get("quantity", 1))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Yanlış məlumat'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if quantity < 1:
+            return Response(
+                {'error': 'Yanlış məlumat'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         if not order.order_items.exists():
             order.is_deleted = True
@@ -51,33 +66,16 @@ class DeleteOrderItemAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        order_item: OrderItem = order.order_items.filter(
-            meal__id=meal_id
-        ).first()
+        with transaction.atomic():
+            missing_meal_ids = self.void_order_items(
+                order, {meal_id: quantity}, request.user)
 
-        if not order_item:
+        if missing_meal_ids:
             return Response(
                 {'error': 'Sifariş yoxdur və ya ödəniş edilib'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if order_item.quantity == 1:
-            order_item.is_deleted_by_adminstrator = True
-            order_item.save()
-            order_item.delete()
-        else:
-            new_quantity = order_item.quantity - 1
-            order_item.quantity = new_quantity
-            order_item.price = new_quantity * order_item.meal.price
-            order_item.save()
-
-        order.refresh_from_db()
-        total_price = order.order_items.aggregate(
-            total=Sum('price', output_field=models.DecimalField())
-        )['total']
-        order.total_price = total_price or Decimal(0)
-        order.save()
-
         if not order.order_items.exists():
             order.is_deleted = True
             return Response(
@@ -86,13 +84,66 @@ class DeleteOrderItemAPIView(APIView):
 
         return Response({}, status=status.HTTP_200_OK)
 
+    def void_order_items(self, order, quantities, user):
+        """
+        Removes the given quantity of each meal from the order, deleting the
+        lines that drop to zero. Line prices shrink proportionally to their
+        stored price, and the order total and table occupancy are shifted
+        once. Must run inside a transaction.
+
+        Returns:
+            missing_meal_ids (list): meals without a line in the order,
+            in which case nothing is changed.
+        """
+        order_items = {}
+        for order_item in order.order_items.select_for_update().filter(
+            meal_id__in=list(quantities)
+        ).order_by("id"):
+            order_items.setdefault(order_item.meal_id, order_item)
+
+        missing_meal_ids = [
+            meal_id for meal_id in quantities if meal_id not in order_items]
+        if missing_meal_ids:
+            return missing_meal_ids
+
+        now = timezone.now()
+        changed, deleted_ids, removed_price = [], [], 0
+        for meal_id, quantity in quantities.items():
+            order_item = order_items[meal_id]
+            if quantity >= order_item.quantity:
+                order_item.is_deleted_by_adminstrator = True
+                removed_price += order_item.price
+                deleted_ids.append(order_item.id)
+            else:
+                new_quantity = order_item.quantity - quantity
+                new_price = (
+                    order_item.price * new_quantity / order_item.quantity
+                ).quantize(Decimal("0.01"))
+                removed_price += order_item.price - new_price
+                order_item.quantity = new_quantity
+                order_item.price = new_price
+            order_item.updated_at = now
+            changed.append(order_item)
+
+        bulk_update_with_history(
+            changed,
+            OrderItem,
+            ['quantity', 'price', 'is_deleted_by_adminstrator', 'updated_at'],
+            default_user=user,
+        )
+        if deleted_ids:
+            OrderItem.objects.filter(id__in=deleted_ids).delete()
+
+        order.add_to_total_price(-removed_price)
+        TableOccupancy.objects.add_to_open_total(
+            order.table_id, -removed_price)
+        return []
+
     def get_order(self, table_id, order_id):
         table = Table.objects.filter(id=table_id).first()
         if not table:
             return Order.objects.none()
 
-        order: Order = table.current_order \
-            if not order_id else \
-            table.current_orders.filter(id=order_id).first()
+        order: Order = table.get_open_order(order_id)
 
         return order
@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from drf_yasg.utils import swagger_auto_schema
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from apps.orders.apis.order_items.remove import DeleteOrderItemAPIView
+from apps.orders.serializers import OrderItemsInputSerializer
+
+
+class DeleteMultipleOrderItemsAPIView(DeleteOrderItemAPIView):
+
+    @swagger_auto_schema(
+        operation_description="Void several meals and quantities from an existing unpaid order for the specified table in one step.",
+        request_body=OrderItemsInputSerializer,
+        responses={
+            200: 'Item quantities updated or items deleted successfully',
+            404: 'Order or item not found, or payment already made',
+            400: 'Invalid data'
+        }
+    )
+    def delete(self, request, table_id):
+        serializer = OrderItemsInputSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Merge repeated meals into a single void
+        quantities = defaultdict(int)
+        for item in serializer.validated_data["items"]:
+            quantities[item["meal_id"]] += item["quantity"]
+
+        order = self.get_order(
+            table_id, serializer.validated_data.get("order_id"))
+        if not order:
+            return Response(
+                {'error': 'Sifariş yoxdur və ya ödəniş edilib'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        with transaction.atomic():
+            missing_meal_ids = self.void_order_items(
+                order, quantities, request.user)
+
+        if missing_meal_ids:
+            return Response(
+                {
+                    'error': 'Sifariş yoxdur və ya ödəniş edilib',
+                    'meal_ids': missing_meal_ids,
+                },
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({}, status=status.HTTP_200_OK)
@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -5,6 +7,8 @@ from rest_framework.views import APIView
 
 from apps.orders.apis.printer import PrinterService
 from apps.orders.models import Order
+from apps.orders.models import SalesFact
+from apps.orders.models import TableOccupancy
 from apps.tables.models import Table
 
 from apps.users.permissions import IsAdminOrOwner
@@ -24,9 +28,7 @@ class CloseTableOrderAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        orders = table.current_orders
-
-        if not orders.exists():
+        if not table.open_orders:
             return Response(
                 {"success": False, "message": "Masada sifariş yoxdur."},
                 status=status.HTTP_404_NOT_FOUND
@@ -34,11 +36,18 @@ class CloseTableOrderAPIView(APIView):
 
         try:
             printer = PrinterService()
-            printer.print_orders_for_table(table_id, False)
+            printer.print_orders(table, False)
         except Exception as e:
             print("Printer error", str(e))
 
-        orders.update(is_paid=True)
+        with transaction.atomic():
+            # Only the orders this close marks paid are added to the facts,
+            # so a concurrent close of the same table cannot count them twice
+            closed_order_ids = list(
+                table.current_orders.select_for_update().values_list("id", flat=True))
+            Order.objects.filter(id__in=closed_order_ids).update(is_paid=True)
+            TableOccupancy.objects.refresh(table)
+            SalesFact.objects.record_orders(closed_order_ids)
         return Response(
             {"success": True, "message": "Sifariş uğurla bağlamşdır."},
             status=status.HTTP_200_OK
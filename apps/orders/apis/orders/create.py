@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework.status import HTTP_400_BAD_REQUEST
 from rest_framework.status import HTTP_201_CREATED
 
@@ -6,6 +8,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.orders.models import Order
+from apps.orders.models import TableOccupancy
 from apps.orders.serializers import OrderSerializer
 from apps.users.permissions import IsWaitressOrCapitaonOrAdminOrOwner
 
@@ -27,6 +30,8 @@ class CreateOrderAPIView(APIView):
         data = {'table': table_id}
         serializer = OrderSerializer(data=data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                TableOccupancy.objects.refresh(table_id)
             return Response(serializer.data, status=HTTP_201_CREATED)
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
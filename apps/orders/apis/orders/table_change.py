@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework.views import APIView
 
 
@@ -10,6 +12,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from apps.orders.models import Order
+from apps.orders.models import TableOccupancy
 from apps.tables.models import Table
 
 
@@ -44,9 +47,7 @@ class ChangeTableOrderAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        orders = table.current_orders
-
-        if not orders.exists():
+        if not table.open_orders:
             return Response(
                 {'error': 'Sifariş yoxdur və ya ödəniş edilib'},
                 status=status.HTTP_404_NOT_FOUND
@@ -67,7 +68,9 @@ class ChangeTableOrderAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        orders.update(table=new_table)
+        with transaction.atomic():
+            table.current_orders.update(table=new_table)
+            TableOccupancy.objects.refresh(table, new_table)
 
         return Response(
             {'message': 'Masa uğurla dəyişdirildi.'},
@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework.views import APIView
 
 
@@ -10,6 +12,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from apps.orders.models import Order
+from apps.orders.models import TableOccupancy
 from apps.tables.models import Table
 
 
@@ -65,11 +68,13 @@ class JoinTableOrdersAPIView(APIView):
                 return Response({"detail": "The target table must have a current order."}, status=status.HTTP_400_BAD_REQUEST)
 
             # Update all orders to be linked to the target table
-            orders_to_join.update(
-                table=table,
-                is_main=False,
-                waitress=table.current_order.waitress
-            )
+            with transaction.atomic():
+                orders_to_join.update(
+                    table=table,
+                    is_main=False,
+                    waitress=table.current_order.waitress
+                )
+                TableOccupancy.objects.refresh(table, *other_tables)
 
             return Response({"detail": "Tables successfully joined."}, status=status.HTTP_200_OK)
 
@@ -1,3 +1,5 @@
+from django.db import transaction
+
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -8,6 +10,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from apps.orders.models import Order
+from apps.orders.models import TableOccupancy
 
 from apps.tables.models import Table
 from apps.users.models import User
@@ -49,15 +52,15 @@ class ChangeWaitressAPIView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        orders = table.current_orders
-
-        if not orders.exists():
+        if not table.open_orders:
             return Response(
                 {'error': 'Sifariş yoxdur və ya ödəniş edilib.'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        orders.update(waitress=new_waitress)
+        with transaction.atomic():
+            table.current_orders.update(waitress=new_waitress)
+            TableOccupancy.objects.refresh(table)
         return Response(
             {'error': 'Ofisiant uğurla dəyişdirildi.'},
             status=status.HTTP_200_OK
@@ -0,0 +1,29 @@
+from rest_framework.generics import ListAPIView
+from rest_framework.generics import RetrieveAPIView
+from rest_framework.permissions import IsAuthenticated
+
+from apps.orders.models import PrintJob
+from apps.orders.serializers import PrintJobSerializer
+from apps.users.permissions import IsWaitressOrCapitaonOrAdminOrOwner
+
+
+class PrintJobAPIView(RetrieveAPIView):
+    serializer_class = PrintJobSerializer
+    permission_classes = [
+        IsAuthenticated,
+        IsWaitressOrCapitaonOrAdminOrOwner
+    ]
+    queryset = PrintJob.objects.all()
+    lookup_url_kwarg = "job_id"
+
+
+class ListTablePrintJobsAPIView(ListAPIView):
+    serializer_class = PrintJobSerializer
+    permission_classes = [
+        IsAuthenticated,
+        IsWaitressOrCapitaonOrAdminOrOwner
+    ]
+
+    def get_queryset(self):
+        table_id = self.kwargs.get("table_id", 0)
+        return PrintJob.objects.filter(table__id=table_id).order_by("-id")[:20]
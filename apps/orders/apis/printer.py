@@ -1,59 +1,148 @@
 
-import os
 import requests
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
+from apps.orders.models import Order
+from apps.orders.models import OrderItem
+from apps.orders.models import PrintJob
+from apps.orders.models import TableOccupancy
 from apps.users.permissions import IsAdminOrOwner
 from apps.tables.models import Table
 
 from datetime import datetime
 from django.conf import settings
+from django.db.models import Prefetch
+
+
+_session = None
+
+
+def printer_session():
+    """
+    Returns the process-wide requests session used to reach the printer,
+    so its keep-alive connection is reused between receipts.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def queue_receipt(table, orders, payload, kind):
+    """
+    Queues a receipt for the table's orders unless a receipt of the same
+    kind for the same orders is already waiting for the printer. Returns
+    (job, message).
+    """
+    order_ids = sorted(order.id for order in orders)
+    for job in PrintJob.objects.unfinished().filter(table=table, kind=kind):
+        if sorted(job.order_ids) == order_ids:
+            return job, "Çek artıq çap növbəsindədir"
+
+    job = PrintJob.objects.enqueue(
+        payload, kind=kind, table=table, orders=orders)
+    return job, "Çek çap növbəsinə əlavə edildi"
+
+
+def receipt_orders(orders):
+    """
+    Loads the given orders with their items and meals in a fixed number of
+    queries, whatever the number of orders joined on the table.
+    """
+    return list(
+        Order.objects.filter(
+            id__in=[order.id for order in orders]
+        ).select_related("waitress").prefetch_related(
+            Prefetch(
+                "order_items",
+                queryset=OrderItem.objects.select_related(
+                    "meal").order_by("id")
+            )
+        ).order_by("id")
+    )
+
+
+def build_receipt(table, orders):
+    """
+    Builds the render model of a receipt shared by the text and JSON
+    printers. Orders must come from receipt_orders.
+    """
+    if not orders:
+        return {}
+
+    main_order = next((order for order in orders if order.is_main), orders[0])
+    waitress = main_order.waitress
+    receipt = {
+        'date': datetime.now().strftime('%d.%m.%Y %H:%M:%S'),
+        'table': {
+            'room': table.room.name if table and table.room else 'N/A',
+            'number': table.number if table else 'N/A'
+        },
+        'waitress': waitress.get_full_name() if waitress else '',
+        'orders': [],
+    }
+
+    for order in orders:
+        items = []
+        order_total = 0
+        for item in order.order_items.all():
+            line_total = item.quantity * item.meal.price
+            items.append({
+                'name': item.meal.name,
+                'quantity': item.quantity,
+                'price': item.meal.price,
+                'line_total': line_total
+            })
+            order_total += line_total
+        receipt['orders'].append({
+            'order_id': order.id,
+            'items': items,
+            'order_total': order_total
+        })
+
+    return receipt
 
 
 class PrinterService:
     PRINTER_URL = settings.PRINTER_URL
+    KIND = "text"
 
     @staticmethod
-    def _generate_header(table):
+    def _generate_header(receipt):
         """Generates the header section of the receipt."""
         return (
-            f"Tarix: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}\n"
+            f"Tarix: {receipt['date']}\n"
             "\n"
-            f"Yer: {table.room.name if table and table.room else 'N/A'} "
-            f"{table.number if table else 'N/A'}\n"
-            f"Ofisiant: {table.current_order.waitress.get_full_name()}\n"
+            f"Yer: {receipt['table']['room']} {receipt['table']['number']}\n"
+            f"Ofisiant: {receipt['waitress']}\n"
             + "-" * 25 + "\n"
         )
 
     @staticmethod
-    def _generate_body_for_orders(orders):
+    def _generate_body_for_orders(receipt):
         """Generates the body section listing all items from multiple orders."""
         body = []
         total = 0
         item_index = 1  # Running index for all items
 
-        for order in orders:
+        for order in receipt['orders']:
             # Include order-specific header
-            order_header = f"Sifariş {order.id}\n"
-            body.append(order_header)
-            order_total = 0
-            items = order.order_items.all()
-            for item in items:
-                name = item.meal.name
-                quantity = item.quantity
-                price = item.meal.price
-                line_total = quantity * price
+            body.append(f"Sifariş {order['order_id']}\n")
+            for item in order['items']:
                 body.append(
-                    f"{item_index}. {name:.<20} {quantity} x {price:,.1f} = {line_total:,.1f}\n"
+                    f"{item_index}. {item['name']:.<20} {item['quantity']} x "
+                    f"{item['price']:,.1f} = {item['line_total']:,.1f}\n"
                 )
-                total += line_total
-                order_total += line_total
                 item_index += 1
-            body.append(f"Sifariş məbləği: {order_total:,.2f} AZN\n")
+            body.append(f"Sifariş məbləği: {order['order_total']:,.2f} AZN\n")
             body.append("-" * 25 + "\n")  # Separator between orders
+            total += order['order_total']
 
         return ''.join(body), total
 
@@ -69,123 +158,80 @@ class PrinterService:
         )
 
     @staticmethod
-    def generate_receipt_text_for_orders(table, orders):
-        """
-        Generates a formatted receipt text from multiple orders.
-        """
-        if not orders:
+    def render(receipt):
+        """Renders a receipt built by build_receipt as printer text."""
+        if not receipt:
             return ""
-        # Generate header using table information
-        header = PrinterService._generate_header(table)
-        # Generate body and total from all orders
-        body, total = PrinterService._generate_body_for_orders(orders)
-        # Generate footer
+        header = PrinterService._generate_header(receipt)
+        body, total = PrinterService._generate_body_for_orders(receipt)
         footer = PrinterService._generate_footer(total)
         return f"\n{header}{body}{footer}\n"
 
-    def send_to_printer(self, text):
-        # Define the file path for the temporary .txt file
-        file_path = "apps/files/temp_print.txt"
+    @staticmethod
+    def generate_receipt_text_for_orders(table, orders):
+        """
+        Generates a formatted receipt text from multiple orders.
+        """
+        return PrinterService.render(
+            build_receipt(table, receipt_orders(orders)))
 
-        try:
-            # Step 1: Write the text to a .txt file
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write(text)
-
-            # Step 2: Send the file via multipart/form-data
-            with open(file_path, "rb") as file:
-                files = {'textFile': ('temp_print.txt', file, 'text/plain')}
-                response = requests.post(
-                    self.PRINTER_URL,
-                    files=files
-                )
+    def send_to_printer(self, text, url=None):
+        # Send the text as an in-memory file via multipart/form-data
+        files = {
+            'textFile': ('temp_print.txt', text.encode("utf-8"), 'text/plain')
+        }
+        return printer_session().post(
+            url or self.PRINTER_URL,
+            files=files,
+            timeout=settings.PRINTER_TIMEOUT
+        )
 
-            # Return the response from the server request
-            return response
+    def print_orders_for_table(self, table_id, force_print=False):
+        table = Table.objects.select_related("room").filter(pk=table_id).first()
+        if not table:
+            return None, "Table does not exist."
+        return self.print_orders(table, force_print)
 
-        finally:
-            # Step 3: Delete the temporary file
-            if os.path.exists(file_path):
-                os.remove(file_path)
+    def print_orders(self, table, force_print=False):
+        """
+        Queues the receipt of the table's unpaid orders for the print
+        worker. Returns (job, message); job is None if nothing was queued.
+        """
+        if not table.can_print_check() and not force_print:
+            return None, "No active order to print or check already printed."
 
-    def print_orders_for_table(self, table_id, force_print=False):
-        try:
-            table = Table.objects.get(pk=table_id)
-            if not table.can_print_check() and not force_print:
-                return False, "No active order to print or check already printed."
-
-            orders = table.current_orders
-            receipt_text = self.generate_receipt_text_for_orders(table, orders)
-            response = self.send_to_printer(receipt_text)
-            if response.status_code == 200:
-                orders.update(is_check_printed=True)
-                return True, "Çek uğurla print edildi"
-            else:
-                return False, "Çek print edilmədi. Printer API qoşulmayıb"
-        except Table.DoesNotExist:
-            return False, "Table does not exist."
+        orders = receipt_orders(table.open_orders)
+        receipt = build_receipt(table, orders)
+        return queue_receipt(table, orders, self.render(receipt), self.KIND)
 
 
-class PrinterServiceJSON:
-    PRINTER_URL = settings.PRINTER_URL
+class PrinterServiceJSON(PrinterService):
+    KIND = "json"
 
     @staticmethod
-    def _generate_order_data(order):
-        """Generates a JSON structure for a single order."""
-        items = []
-        total = 0
-        for item in order.order_items.all():
-            line_total = item.quantity * item.meal.price
-            items.append({
-                'name': item.meal.name,
-                'quantity': item.quantity,
-                'price': item.meal.price,
-                'line_total': line_total
-            })
-            total += line_total
-
-        return {
-            'order_id': order.id,
-            'items': items,
-            'order_total': total
-        }
+    def render(receipt):
+        """The JSON printer takes the receipt render model as is."""
+        return receipt
 
     @staticmethod
     def generate_receipt_data_for_orders(table, orders):
         """
         Generates a JSON object that will be sent to Electron JS for receipt printing.
         """
-        if not orders:
-            return {}
-
-        # Generate the basic information about the table and orders
-        receipt_data = {
-            'date': datetime.now().strftime('%d.%m.%Y %H:%M:%S'),
-            'table': {
-                'room': table.room.name if table and table.room else 'N/A',
-                'number': table.number if table else 'N/A'
-            },
-            'waitress': table.current_order.waitress.get_full_name(),
-            'orders': []
-        }
-
-        # Add each order and its items to the receipt data
-        for order in orders:
-            receipt_data['orders'].append(
-                PrinterServiceJSON._generate_order_data(order))
+        return build_receipt(table, receipt_orders(orders))
 
-        return receipt_data
-
-    def send_to_printer(self, data):
+    def send_to_printer(self, data, url=None):
         """
-        Sends the receipt data (as JSON) to the printer (Electron JS).
+        Sends the receipt data (as JSON) to the printer (Electron JS),
+        at url or the configured PRINTER_URL.
         """
         try:
             # Step 1: Send the data as JSON to the printer service
-            response = requests.post(
-                self.PRINTER_URL,
+            response = printer_session().post(
+                url or self.PRINTER_URL,
                 json=data,
-                headers={'Content-Type': 'application/json'}
+                headers={'Content-Type': 'application/json'},
+                timeout=settings.PRINTER_TIMEOUT
             )
 
             # Return the response from the server request
@@ -195,24 +241,6 @@ class PrinterServiceJSON:
             print(f"Error while sending data to printer: {e}")
             return None
 
-    def print_orders_for_table(self, table_id, force_print=False):
-        try:
-            table = Table.objects.get(pk=table_id)
-            if not table.can_print_check() and not force_print:
-                return False, "No active order to print or check already printed."
-
-            orders = table.current_orders
-            receipt_data = self.generate_receipt_data_for_orders(table, orders)
-            response = self.send_to_printer(receipt_data)
-
-            if response and response.status_code == 200:
-                orders.update(is_check_printed=True)
-                return True, "Çek uğurla print edildi"
-            else:
-                return False, "Çek print edilmədi. Printer API qoşulmayıb"
-        except Table.DoesNotExist:
-            return False, "Table does not exist."
-
 
 class PrintCheckAPIView(APIView):
     permission_classes = [IsAuthenticated, IsAdminOrOwner]
@@ -227,9 +255,9 @@ class PrintCheckAPIView(APIView):
             else:
                 printer = PrinterServiceJSON()
 
-            success, message = printer.print_orders_for_table(table_id)
-            if success:
-                return Response({"message": message}, status=status.HTTP_200_OK)
+            job, message = printer.print_orders_for_table(table_id)
+            if job:
+                return Response({"message": message, "job_id": job.id}, status=status.HTTP_200_OK)
             else:
                 return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -242,13 +270,13 @@ class PrintCheckAPIView(APIView):
         table = Table.objects.filter(id=table_id).first()
         if not table:
             return Response({"error": "Masa tapılmadı."}, status=status.HTTP_404_NOT_FOUND)
-        orders = table.current_orders
-        if not orders.exists():
+        if not table.open_orders:
             return Response({"error": "Masa üçün sifariş tapılmadı."}, status=status.HTTP_404_NOT_FOUND)
 
         if table.can_print_check():
             return Response({"error": "Masa üçün çek print etmək mümkündür."}, status=status.HTTP_404_NOT_FOUND)
-        orders.update(is_check_printed=False)
+        table.current_orders.update(is_check_printed=False)
+        TableOccupancy.objects.refresh(table)
         table.save()
 
         return Response({"success": True, "message": "Masa üçün yenidən çek print etmək mümkündür."}, status=status.HTTP_200_OK)
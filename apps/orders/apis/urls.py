@@ -4,8 +4,10 @@ from apps.orders.apis import CreateOrderAPIView
 from apps.orders.apis import CheckOrderAPIView
 
 from apps.orders.apis import AddOrderItemAPIView
+from apps.orders.apis import AddMultipleOrderItemsAPIView
 from apps.orders.apis import ListOrderItemsAPIView
 from apps.orders.apis import DeleteOrderItemAPIView
+from apps.orders.apis import DeleteMultipleOrderItemsAPIView
 
 from apps.orders.apis import CloseTableOrderAPIView
 from apps.orders.apis import ChangeTableOrderAPIView
@@ -16,6 +18,8 @@ from apps.orders.apis import ListWaitressAPIView
 from apps.orders.apis import ChangeWaitressAPIView
 
 from apps.orders.apis import PrintCheckAPIView
+from apps.orders.apis import PrintJobAPIView
+from apps.orders.apis import ListTablePrintJobsAPIView
 
 urlpatterns = [
     path(
@@ -36,6 +40,12 @@ urlpatterns = [
         name='add-order-item'
     ),
 
+    path(
+        '<int:table_id>/add-order-items/',
+        AddMultipleOrderItemsAPIView.as_view(),
+        name='add-order-items'
+    ),
+
 
     path(
         '<int:table_id>/delete-order-item/',
@@ -43,6 +53,12 @@ urlpatterns = [
         name='delete-order-item'
     ),
 
+    path(
+        '<int:table_id>/delete-order-items/',
+        DeleteMultipleOrderItemsAPIView.as_view(),
+        name='delete-order-items'
+    ),
+
     path(
         '<int:table_id>/list-order-items/',
         ListOrderItemsAPIView.as_view(),
@@ -90,4 +106,16 @@ urlpatterns = [
         PrintCheckAPIView.as_view(),
         name='print-check'
     ),
+
+    path(
+        '<int:table_id>/print-jobs/',
+        ListTablePrintJobsAPIView.as_view(),
+        name='list-print-jobs'
+    ),
+
+    path(
+        'print-jobs/<int:job_id>/',
+        PrintJobAPIView.as_view(),
+        name='print-job'
+    ),
 ]
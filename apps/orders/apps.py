@@ -5,3 +5,7 @@ class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.orders'
     verbose_name = "Sifariş"
+
+    def ready(self) -> None:
+        import apps.orders.signals
+        return super().ready()
@@ -0,0 +1,52 @@
+from datetime import date
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.orders.models import Order
+from apps.orders.models import SalesFact
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily sales facts from paid orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat,
+                            help='First day to rebuild (YYYY-MM-DD), defaults to the first paid order')
+        parser.add_argument('--end', type=date.fromisoformat,
+                            help='Last day to rebuild (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--days-per-batch', type=int, default=31,
+                            help='Number of days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        if options['days_per_batch'] < 1:
+            raise CommandError('--days-per-batch must be at least 1')
+
+        bounds = Order.objects.all_orders().filter(is_paid=True).annotate(
+            day=TruncDate('created_at')
+        ).aggregate(first=Min('day'), last=Max('day'))
+        start = options['start'] or bounds['first']
+        end = options['end'] or timezone.localdate()
+        if not start:
+            self.stdout.write('No paid orders to backfill')
+            return
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        step = options['days_per_batch']
+        day, facts = start, 0
+        while day <= end:
+            batch_end = min(day + timedelta(days=step - 1), end)
+            facts += SalesFact.objects.rebuild_days(
+                day + timedelta(days=n) for n in range((batch_end - day).days + 1)
+            )
+            self.stdout.write(f'{day} - {batch_end} rebuilt')
+            day = batch_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {facts} sales fact(s) from {start} to {end}'))
@@ -0,0 +1,111 @@
+import statistics
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from apps.orders.admin.histories import HistoricalOrderItem
+from apps.orders.admin.histories import HistoricalOrderItemAdmin
+from apps.orders.management.seed import isolated_cache
+from apps.orders.management.seed import seed_restaurant
+from apps.orders.models import Order
+from apps.orders.models import OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Seeds a throwaway database and compares the query plans of the hot order filters with and without their indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=20000,
+                            help='Number of paid orders to seed')
+        parser.add_argument('--tables', type=int, default=100,
+                            help='Number of tables to seed')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Runs per query when timing')
+
+    @isolated_cache()
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write('Seeding...')
+            staff, tables = seed_restaurant(
+                tables=options['tables'], orders=options['orders'])
+            # Give the planner statistics, as a live database would have
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.benchmark(staff, tables, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def queries(self, staff, tables):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        day_range = (
+            timezone.make_aware(datetime.combine(yesterday, time.min)),
+            timezone.make_aware(datetime.combine(yesterday, time.max)),
+        )
+        waitress = next(user for user in staff if user.type == 'waitress')
+        table = next(table for table in tables if table.orders.filter(
+            is_paid=False).exists())
+        item = OrderItem.objects.order_by('-id').first()
+        return {
+            'open orders of a table': Order.objects.filter(
+                table=table, is_paid=False),
+            'main order of a table': Order.objects.filter(
+                table=table, is_paid=False, is_main=True).order_by('id')[:1],
+            'paid orders of a day': Order.objects.filter(
+                is_paid=True, created_at__range=day_range),
+            'orders of a waitress in a week': Order.objects.filter(
+                waitress=waitress,
+                created_at__gte=timezone.now() - timedelta(days=7)),
+            'order line of a meal': OrderItem.objects.filter(
+                order_id=item.order_id, meal_id=item.meal_id),
+            'latest item snapshots': HistoricalOrderItemAdmin.latest_snapshots(
+                HistoricalOrderItem.objects.all()),
+        }
+
+    def measure(self, queries, repeat):
+        results = {}
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(repeat):
+                start = perf_counter()
+                list(queryset.values_list('pk', flat=True))
+                timings.append((perf_counter() - start) * 1000)
+            results[name] = (queryset.explain(), statistics.median(timings))
+        return results
+
+    def indexes(self):
+        for model in (Order, OrderItem, Order.history.model, OrderItem.history.model):
+            for index in model._meta.indexes:
+                yield model, index
+
+    def benchmark(self, staff, tables, repeat):
+        queries = self.queries(staff, tables)
+        after = self.measure(queries, repeat)
+
+        with connection.schema_editor() as editor:
+            for model, index in self.indexes():
+                editor.remove_index(model, index)
+        before = self.measure(queries, repeat)
+        with connection.schema_editor() as editor:
+            for model, index in self.indexes():
+                editor.add_index(model, index)
+
+        for name in queries:
+            plan_before, ms_before = before[name]
+            plan_after, ms_after = after[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f'  before ({ms_before:.2f} ms):')
+            self.stdout.write(self.indent(plan_before))
+            self.stdout.write(f'  after ({ms_after:.2f} ms):')
+            self.stdout.write(self.indent(plan_after))
+
+    @staticmethod
+    def indent(plan):
+        return '\n'.join(f'    {line}' for line in plan.splitlines())
@@ -0,0 +1,94 @@
+import statistics
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.orders.management.query_budgets import ENDPOINTS
+from apps.orders.management.query_budgets import measure_endpoints
+from apps.orders.management.query_budgets import round_context
+from apps.orders.management.query_budgets import staff_client
+from apps.orders.management.seed import isolated_cache
+from apps.orders.management.seed import seed_finance
+from apps.orders.management.seed import seed_restaurant
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class Command(BaseCommand):
+    help = 'Seeds a throwaway database, calls every API endpoint and fails when one exceeds its query budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5,
+                            help='Number of times every endpoint is called')
+        parser.add_argument('--orders', type=int, default=3000,
+                            help='Number of paid orders to seed')
+        parser.add_argument('--tables', type=int, default=100,
+                            help='Number of tables to seed')
+        parser.add_argument('--meals', type=int, default=500,
+                            help='Number of meals to seed')
+
+    @isolated_cache()
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write('Seeding...')
+            staff, tables = seed_restaurant(
+                tables=options['tables'],
+                meals=options['meals'],
+                orders=options['orders'],
+            )
+            seed_finance()
+            failures = self.run_rounds(staff, options['rounds'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if failures:
+            raise CommandError(
+                'Query budget exceeded or unexpected response:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All endpoints are within budget'))
+
+    def run_rounds(self, staff, rounds):
+        client = staff_client(
+            next(user for user in staff if user.type == 'restaurant'))
+
+        query_counts = defaultdict(list)
+        timings = defaultdict(list)
+        failures = []
+        for _ in range(rounds):
+            context = round_context(staff)
+            for endpoint, response, queries, elapsed in measure_endpoints(
+                    client, context):
+                name, _, _, _, budget, accepted = endpoint
+                timings[name].append(elapsed)
+                query_counts[name].append(queries)
+
+                if response.status_code not in accepted:
+                    failures.append(
+                        f'{name}: status {response.status_code} {getattr(response, "data", "")}')
+                if queries > budget:
+                    failures.append(
+                        f'{name}: {queries} queries, budget {budget}')
+
+        self.report(query_counts, timings)
+        return failures
+
+    def report(self, query_counts, timings):
+        self.stdout.write(
+            f'{"endpoint":<22}{"budget":>8}{"queries":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+        for name, _, _, _, budget, _ in ENDPOINTS:
+            times = timings[name]
+            line = (
+                f'{name:<22}{budget:>8}{max(query_counts[name]):>9}'
+                f'{statistics.median(times):>9.1f}{percentile(times, 0.95):>9.1f}'
+                f'{percentile(times, 0.99):>9.1f}'
+            )
+            if max(query_counts[name]) > budget:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
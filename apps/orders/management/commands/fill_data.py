@@ -3,6 +3,7 @@ from faker import Faker
 from django.utils import timezone
 import random
 from apps.orders.models import Order
+from apps.orders.models import TableOccupancy
 from apps.tables.models import Table
 from apps.users.models import User
 
@@ -33,3 +34,5 @@ class Command(BaseCommand):
             )
             order.save()
             self.stdout.write(f'Created order {order.id}')
+
+        TableOccupancy.objects.rebuild()
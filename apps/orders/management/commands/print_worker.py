@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.apis.printer import PrinterService
+from apps.orders.apis.printer import PrinterServiceJSON
+from apps.orders.models import PrintJob
+
+
+def printer_senders():
+    return {
+        'text': PrinterService(),
+        'json': PrinterServiceJSON(),
+    }
+
+
+def send_job(job, senders):
+    """
+    Sends a claimed job to the printer it was queued for, the one its
+    ordering in claim_next is keyed on, and records the outcome.
+    Returns the error, or None once the receipt is printed.
+    """
+    try:
+        response = senders[job.kind].send_to_printer(
+            job.payload, url=job.printer)
+    except Exception as e:
+        job.mark_failed(e)
+        return str(e)
+
+    if response is not None and response.status_code == 200:
+        job.mark_done()
+        return None
+
+    error = (
+        f'Printer responded {response.status_code}: {response.text}'
+        if response is not None else 'Printer is unreachable'
+    )
+    job.mark_failed(error)
+    return error
+
+
+class Command(BaseCommand):
+    help = 'Sends queued receipts to the printer, retrying failed jobs with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no job is due instead of polling')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=120,
+                            help='Seconds after which a job left sending is queued again')
+
+    def handle(self, *args, **options):
+        senders = printer_senders()
+        requeued = PrintJob.objects.requeue_stale(
+            timedelta(seconds=options['stale_after']))
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale job(s)')
+
+        while True:
+            job = PrintJob.objects.claim_next()
+            if not job:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+
+            error = send_job(job, senders)
+            if error:
+                self.stderr.write(f'Job {job.id} failed: {error}')
+            else:
+                self.stdout.write(f'Job {job.id} printed')
@@ -0,0 +1,414 @@
+import logging
+import os
+import queue
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from time import perf_counter
+
+import requests
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from apps.meals.models import Meal
+from apps.orders.management.commands.check_query_budgets import percentile
+from apps.orders.management.commands.print_worker import printer_senders
+from apps.orders.management.commands.print_worker import send_job
+from apps.orders.management.seed import isolated_cache
+from apps.orders.management.seed import seed_restaurant
+from apps.orders.models import PrintJob
+from apps.tables.models import Table
+from apps.users.models import User
+
+
+LOCK_ERRORS = ("locked", "deadlock", "could not obtain lock", "could not serialize")
+
+
+class StandInPrinter:
+    """
+    Local stand-in for the printer bridge: accepts every receipt after the
+    given latency, so printing never depends on the hardware.
+    """
+
+    def __init__(self, latency, port=0):
+        self.printed = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                time.sleep(latency)
+                stand_in.printed += 1
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/print"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class InProcessClient:
+    """Calls the API through the Django test client, in this process."""
+
+    def __init__(self, pin):
+        self.client = APIClient()
+        self.client.credentials(HTTP_X_PIN=pin)
+
+    def call(self, method, path, payload=None):
+        response = getattr(self.client, method)(path, payload, format="json")
+        return response.status_code, getattr(response, "data", None)
+
+
+class LiveClient:
+    """Calls the API of a running server over HTTP."""
+
+    def __init__(self, pin, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers["X-PIN"] = pin
+
+    def call(self, method, path, payload=None):
+        response = self.session.request(
+            method, self.base_url + path, json=payload, timeout=30)
+        try:
+            data = response.json()
+        except ValueError:
+            data = response.text
+        return response.status_code, data
+
+
+class Rush:
+    """Shared state of a run: free tables, timings and errors."""
+
+    def __init__(self, tables, meals, deadline, think_time, seed):
+        self.free_tables = queue.Queue()
+        for table_id in tables:
+            self.free_tables.put(table_id)
+        self.meals = meals
+        self.deadline = deadline
+        self.think_time = think_time
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock_errors = defaultdict(int)
+        self.failures = []
+        self.services = 0
+
+    def over(self):
+        return time.monotonic() >= self.deadline
+
+    def think(self, rng):
+        time.sleep(rng.uniform(0, self.think_time))
+
+    def call(self, client, name, method, path, payload=None, accepted=(200,)):
+        start = perf_counter()
+        try:
+            status, data = client.call(method, path, payload)
+        except Exception as e:
+            status, data = None, f"{type(e).__name__}: {e}"
+        elapsed = (perf_counter() - start) * 1000
+
+        with self.lock:
+            self.timings[name].append(elapsed)
+            if status not in accepted:
+                self.errors[name] += 1
+                if any(marker in str(data).lower() for marker in LOCK_ERRORS):
+                    self.lock_errors[name] += 1
+                if len(self.failures) < 20:
+                    self.failures.append(f"{name}: {status} {str(data)[:200]}")
+        return status in accepted
+
+    def take_table(self):
+        try:
+            return self.free_tables.get(timeout=1)
+        except queue.Empty:
+            return None
+
+    def release(self, *table_ids):
+        for table_id in table_ids:
+            self.free_tables.put(table_id)
+
+
+def serve_tables(rush, waiter, cashier, number):
+    """
+    One waiter's shift: seats guests at a free table and takes a few rounds
+    of orders; the cashier now and then moves them or joins a neighbouring
+    table, then prints the check and closes the table.
+    """
+    rng = random.Random(rush.seed + number)
+    try:
+        while not rush.over():
+            table_id = rush.take_table()
+            if table_id is None:
+                continue
+            tables = [table_id]
+            try:
+                serve_table(rush, rng, waiter, cashier, tables)
+            finally:
+                rush.release(*tables)
+    finally:
+        connections.close_all()
+
+
+def serve_table(rush, rng, waiter, cashier, tables):
+    if not rush.call(waiter, "create order", "post",
+                     f"/api/orders/{tables[0]}/create/", {}, (201,)):
+        return
+
+    for _ in range(rng.randint(1, 4)):
+        rush.think(rng)
+        if rng.random() < 0.3:
+            rush.call(waiter, "add order item", "post",
+                      f"/api/orders/{tables[0]}/add-order-item/",
+                      {"meal_id": rng.choice(rush.meals), "quantity": rng.randint(1, 3)})
+        else:
+            rush.call(waiter, "add order items", "post",
+                      f"/api/orders/{tables[0]}/add-order-items/",
+                      {"items": [
+                          {"meal_id": meal_id, "quantity": rng.randint(1, 3)}
+                          for meal_id in rng.sample(rush.meals, rng.randint(2, 6))
+                      ]})
+        if rng.random() < 0.5:
+            rush.call(waiter, "list order items", "get",
+                      f"/api/orders/{tables[0]}/list-order-items/")
+
+    rush.think(rng)
+    roll = rng.random()
+    if roll < 0.1:
+        new_table = rush.take_table()
+        if new_table is not None:
+            tables.append(new_table)
+            if rush.call(cashier, "change table", "post",
+                         f"/api/orders/{tables[0]}/change-table-for-order/",
+                         {"new_table_id": new_table}):
+                tables.reverse()
+    elif roll < 0.2:
+        other_table = rush.take_table()
+        if other_table is not None:
+            tables.append(other_table)
+            if rush.call(waiter, "create order", "post",
+                         f"/api/orders/{other_table}/create/", {}, (201,)):
+                rush.call(waiter, "add order items", "post",
+                          f"/api/orders/{other_table}/add-order-items/",
+                          {"items": [{"meal_id": rng.choice(rush.meals), "quantity": 1}]})
+                rush.call(cashier, "join tables", "post",
+                          f"/api/orders/{tables[0]}/join-tables-orders/",
+                          {"other_table_ids": [other_table]})
+
+    rush.think(rng)
+    rush.call(cashier, "print check", "post",
+              f"/api/orders/{tables[0]}/print-check/", None, (200, 400))
+    rush.think(rng)
+    for table_id in tables:
+        # A joined or moved-from table is already empty and answers 404.
+        # A failed close is retried so the table goes back to the pool free.
+        for _ in range(3):
+            if rush.call(cashier, "close table", "delete",
+                         f"/api/orders/{table_id}/close-table-for-order/", None,
+                         (200, 404) if table_id != tables[0] else (200,)):
+                break
+    with rush.lock:
+        rush.services += 1
+
+
+def drain_print_queue(stop):
+    """Print worker of the run, sending receipts to the stand-in printer."""
+    senders = printer_senders()
+    try:
+        while True:
+            job = PrintJob.objects.claim_next()
+            if job:
+                send_job(job, senders)
+            elif stop.is_set():
+                return
+            else:
+                time.sleep(0.05)
+    finally:
+        connections.close_all()
+
+
+def sample_lock_waits(stop, samples):
+    """Counts lock requests PostgreSQL keeps waiting, every 100 ms."""
+    try:
+        with connection.cursor() as cursor:
+            while not stop.is_set():
+                cursor.execute("SELECT count(*) FROM pg_locks WHERE NOT granted")
+                samples.append(cursor.fetchone()[0])
+                time.sleep(0.1)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Replays a dinner rush of concurrent waiters against the API and reports throughput, latency and lock contention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--waiters', type=int, default=8,
+                            help='Number of waiters working at the same time')
+        parser.add_argument('--duration', type=int, default=60,
+                            help='Length of the rush in seconds')
+        parser.add_argument('--think-time', type=float, default=0.2,
+                            help='Longest pause of a waiter between two calls, in seconds')
+        parser.add_argument('--url',
+                            help='Base URL of a running server sharing this database; '
+                                 'by default the API is called in-process on a throwaway database')
+        parser.add_argument('--printer-latency', type=float, default=0.05,
+                            help='Seconds the stand-in printer takes per receipt')
+        parser.add_argument('--printer-port', type=int, default=0,
+                            help='Port of the stand-in printer; with --url, run the server '
+                                 'with PRINTER_URL=http://127.0.0.1:<port>/print')
+        parser.add_argument('--tables', type=int, default=100,
+                            help='Number of tables to seed in-process')
+        parser.add_argument('--meals', type=int, default=500,
+                            help='Number of meals to seed in-process')
+        parser.add_argument('--orders', type=int, default=3000,
+                            help='Number of paid orders to seed in-process')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed of the random service')
+
+    @isolated_cache()
+    def handle(self, *args, **options):
+        if options['url']:
+            self.run(options)
+            return
+
+        # In-memory SQLite databases lock whole tables between threads, so
+        # the throwaway database is kept on disk
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            test_settings['NAME'] = os.path.join(
+                tempfile.gettempdir(), 'dinner_rush.sqlite3')
+
+        # Failed calls are counted in the report rather than logged one by one
+        logging.getLogger('django.request').disabled = True
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write('Seeding...')
+            seed_restaurant(
+                tables=options['tables'],
+                meals=options['meals'],
+                orders=options['orders'],
+                seed=options['seed'],
+            )
+            self.run(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        waiters = list(User.objects.filter(
+            type='waitress', is_active=True).values_list('username', flat=True))
+        cashier = User.objects.filter(
+            type__in=['admin', 'restaurant'], is_active=True
+        ).values_list('username', flat=True).first()
+        tables = list(Table.objects.filter(
+            occupancy__open_orders_count=0).values_list('id', flat=True))
+        meals = list(Meal.objects.filter(
+            category__isnull=False).values_list('id', flat=True))
+        if not waiters or not cashier or not tables or len(meals) < 6:
+            raise CommandError(
+                'The database needs waitresses, an admin or owner, free tables and at least 6 meals')
+
+        if options['url']:
+            def make_client(pin):
+                return LiveClient(pin, options['url'])
+        else:
+            make_client = InProcessClient
+
+        rush = Rush(
+            tables, meals,
+            deadline=time.monotonic() + options['duration'],
+            think_time=options['think_time'],
+            seed=options['seed'],
+        )
+        stop = threading.Event()
+        lock_samples = []
+
+        with StandInPrinter(options['printer_latency'], options['printer_port']) as printer:
+            # Jobs go to the printer they are queued for
+            with override_settings(PRINTER_URL=printer.url):
+                helpers = [threading.Thread(target=drain_print_queue, args=(stop,))]
+                if connection.vendor == 'postgresql':
+                    helpers.append(threading.Thread(
+                        target=sample_lock_waits, args=(stop, lock_samples)))
+                shift = [
+                    threading.Thread(target=serve_tables, args=(
+                        rush,
+                        make_client(waiters[number % len(waiters)]),
+                        make_client(cashier),
+                        number,
+                    ))
+                    for number in range(options['waiters'])
+                ]
+
+                self.stdout.write(
+                    f'{options["waiters"]} waiter(s) serving {len(tables)} table(s) '
+                    f'for {options["duration"]}s...')
+                started = time.monotonic()
+                for thread in helpers + shift:
+                    thread.start()
+                for thread in shift:
+                    thread.join()
+                elapsed = time.monotonic() - started
+                stop.set()
+                for thread in helpers:
+                    thread.join()
+
+        self.report(rush, elapsed, printer.printed, lock_samples)
+
+    def report(self, rush, elapsed, printed, lock_samples):
+        total = sum(len(times) for times in rush.timings.values())
+        self.stdout.write(
+            f'{"endpoint":<20}{"calls":>7}{"errors":>8}{"locked":>8}'
+            f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+        for name, times in sorted(rush.timings.items()):
+            line = (
+                f'{name:<20}{len(times):>7}{rush.errors[name]:>8}'
+                f'{rush.lock_errors[name]:>8}{statistics.median(times):>9.1f}'
+                f'{percentile(times, 0.95):>9.1f}{percentile(times, 0.99):>9.1f}'
+            )
+            if rush.errors[name]:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+
+        self.stdout.write(
+            f'\n{total} request(s) in {elapsed:.1f}s: {total / elapsed:.1f} req/s, '
+            f'{rush.services} table(s) served ({rush.services * 60 / elapsed:.1f}/min)')
+        self.stdout.write(
+            f'Receipts printed: {printed}, '
+            f'left in queue: {PrintJob.objects.unfinished().count()}')
+        self.stdout.write(
+            f'Lock errors: {sum(rush.lock_errors.values())} '
+            f'of {sum(rush.errors.values())} failed request(s)')
+        if lock_samples:
+            waiting = [sample for sample in lock_samples if sample]
+            self.stdout.write(
+                f'Waiting locks: max {max(lock_samples)}, '
+                f'mean {statistics.mean(lock_samples):.2f}, '
+                f'present in {len(waiting) * 100 / len(lock_samples):.0f}% of samples')
+        for failure in rush.failures:
+            self.stderr.write(failure)
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from apps.orders.models import Order
+from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
+
+CENT = Decimal("0.01")
+
+
+class Command(BaseCommand):
+    help = 'Compares order totals with the sum of their items and optionally repairs the drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Rewrite drifted totals from their items')
+        parser.add_argument('--all', action='store_true',
+                            help='Include orders archived by a Z-check')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of orders repaired per UPDATE')
+
+    def handle(self, *args, **options):
+        orders = Order.objects.all_orders() if options['all'] else Order.objects.all()
+        items_total = Coalesce(
+            Subquery(
+                OrderItem.objects.all_order_items().filter(
+                    order=OuterRef('pk')
+                ).values('order').annotate(
+                    total=Sum('price')
+                ).values('total'),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            ),
+            Value(Decimal(0)),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+
+        drifted, drift_sum = [], Decimal(0)
+        rows = orders.annotate(items_total=items_total).values_list(
+            'id', 'table_id', 'is_paid', 'total_price', 'items_total'
+        ).order_by('id')
+        for order_id, table_id, is_paid, total_price, expected in rows.iterator():
+            drift = Decimal(expected or 0).quantize(CENT) - \
+                Decimal(total_price or 0).quantize(CENT)
+            if drift:
+                drifted.append((order_id, table_id, is_paid))
+                drift_sum += drift
+                self.stdout.write(
+                    f'Order {order_id}: stored {total_price}, items {expected}, drift {drift:+}')
+
+        self.stdout.write(
+            f'{len(drifted)} order(s) drifted, total drift {drift_sum:+}')
+
+        if not drifted or not options['fix']:
+            return
+
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            for start in range(0, len(drifted), batch_size):
+                ids = [order_id for order_id, _, _ in drifted[start:start + batch_size]]
+                Order.objects.all_orders().filter(id__in=ids).update(
+                    total_price=items_total)
+            TableOccupancy.objects.refresh(*{
+                table_id for _, table_id, is_paid in drifted if not is_paid
+            })
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired {len(drifted)} order total(s)'))
@@ -0,0 +1,150 @@
+from time import perf_counter
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.meals.models import Meal
+from apps.orders.models import PrintJob
+from apps.tables.models import Table
+
+
+# (name, method, path, payload, query budget, accepted status codes)
+# Paths and payloads are formatted with the tables and meals of a round.
+# Budgets include the PIN lookup of an uncached request.
+ENDPOINTS = [
+    ("tables", "get", "/api/tables/{room}/tables/", None, 4, (200,)),
+    ("rooms", "get", "/api/tables/rooms/", None, 4, (200,)),
+    ("table details", "get", "/api/tables/{table}/details", None, 5, (200,)),
+    ("events token", "get", "/api/tables/events/token/", None, 2, (200,)),
+    ("table events", "stream", "/api/tables/{room}/events/?token={events_token}", None, 3, (200,)),
+    ("meal categories", "get", "/api/meals/categories/", None, 4, (200,)),
+    ("meals", "get", "/api/meals/meals/?meal_category_id={category}", None, 4, (200,)),
+    ("menu snapshot", "get", "/api/meals/menu/", None, 4, (200,)),
+    ("check status", "get", "/api/orders/{table}/check-status/", None, 4, (404,)),
+    ("create order", "post", "/api/orders/{table}/create/", {}, 11, (201,)),
+    ("add order item", "post", "/api/orders/{table}/add-order-item/",
+     {"meal_id": "{meal}", "quantity": 2}, 15, (200,)),
+    ("add order items", "post", "/api/orders/{table}/add-order-items/",
+     {"items": "{items}"}, 17, (200,)),
+    ("list order items", "get", "/api/orders/{table}/list-order-items/", None, 7, (200,)),
+    ("list orders", "get", "/api/orders/{table}/list-orders/", None, 6, (200,)),
+    ("delete order item", "delete", "/api/orders/{table}/delete-order-item/",
+     {"meal_id": "{meal}", "quantity": 1}, 15, (200,)),
+    ("delete order items", "delete", "/api/orders/{table}/delete-order-items/",
+     {"items": "{void_items}"}, 15, (200,)),
+    ("list waitress", "get", "/api/orders/list-waitress/", None, 4, (200,)),
+    ("change waitress", "post", "/api/orders/{table}/change-waitress/",
+     {"new_waitress_id": "{waitress}"}, 13, (200,)),
+    ("change table", "post", "/api/orders/{table}/change-table-for-order/",
+     {"new_table_id": "{new_table}"}, 13, (200,)),
+    ("create joined order", "post", "/api/orders/{joined_table}/create/", {}, 11, (201,)),
+    ("join tables", "post", "/api/orders/{new_table}/join-tables-orders/",
+     {"other_table_ids": ["{joined_table}"]}, 15, (200,)),
+    ("print check", "post", "/api/orders/{new_table}/print-check/", None, 11, (200,)),
+    ("list print jobs", "get", "/api/orders/{new_table}/print-jobs/", None, 4, (200,)),
+    ("print job", "get", "/api/orders/print-jobs/{print_job}/", None, 4, (200,)),
+    ("allow reprint", "delete", "/api/orders/{new_table}/print-check/", None, 11, (200,)),
+    ("close table", "delete", "/api/orders/{new_table}/close-table-for-order/", None, 21, (200,)),
+    ("add income", "post", "/api/finance/income/",
+     {"amount": "25.00", "payment_type": "cashier", "date": "{today}"}, 4, (201,)),
+    ("add expense", "post", "/api/finance/expense/",
+     {"amount": "10.00", "category": "other", "date": "{today}"}, 4, (201,)),
+    ("incomes", "get", "/api/finance/incomes/", None, 4, (200,)),
+    ("expenses", "get", "/api/finance/expenses/", None, 4, (200,)),
+    ("daily result", "get", "/api/finance/daily-result/", None, 5, (200,)),
+    ("all results", "get", "/api/finance/all-results/", None, 5, (200,)),
+]
+
+
+def fill(value, context):
+    """Formats the placeholders of a path or payload with the round context."""
+    if isinstance(value, str):
+        if value.startswith("{") and value.endswith("}") and value[1:-1] in context:
+            return context[value[1:-1]]
+        return value.format(**context)
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    return value
+
+
+def staff_client(user):
+    """An API client signing in with the user's PIN, as the tablets do."""
+    return APIClient(HTTP_X_PIN=user.username)
+
+
+def round_context(staff):
+    """Picks the free tables, meals and waitress a round of calls works on."""
+    free_tables = list(Table.objects.filter(
+        occupancy__open_orders_count=0).order_by('id')[:3])
+    meals = list(Meal.objects.filter(
+        category__isnull=False).order_by('?')[:12])
+    waitresses = [user for user in staff if user.type == 'waitress']
+    return {
+        'room': free_tables[0].room_id,
+        'table': free_tables[0].id,
+        'new_table': free_tables[1].id,
+        'joined_table': free_tables[2].id,
+        'category': meals[0].category_id,
+        'meal': meals[0].id,
+        'items': [
+            {'meal_id': meal.id, 'quantity': 2} for meal in meals[1:11]],
+        'void_items': [
+            {'meal_id': meal.id, 'quantity': 1} for meal in meals[1:3]],
+        'waitress': waitresses[-1].id,
+        'today': timezone.localdate().isoformat(),
+    }
+
+
+async def read_stream(path):
+    """Opens an event stream and reads it until the server ends it."""
+    response = await AsyncClient().get(path)
+    if response.streaming:
+        async for _ in response.streaming_content:
+            pass
+    return response
+
+
+def call(client, method, path, payload):
+    if method == "stream":
+        # A stream sending its snapshot, then ending at its first poll
+        with override_settings(
+                FLOOR_EVENTS_MAX_AGE=0.05, FLOOR_EVENTS_POLL_INTERVAL=0.1):
+            return async_to_sync(read_stream)(path)
+    return getattr(client, method)(path, payload, format='json')
+
+
+def measure_endpoints(client, context):
+    """
+    Calls every endpoint of ENDPOINTS once, in order, with cold caches.
+    Yields each entry with its response, the number of queries it ran and
+    the time it took in milliseconds.
+    """
+    for endpoint in ENDPOINTS:
+        name, method, path, payload, _, _ = endpoint
+        if name == 'print job':
+            context['print_job'] = PrintJob.objects.latest('id').id
+        if name == 'allow reprint':
+            # Only a printed check may be reprinted
+            PrintJob.objects.get(id=context['print_job']).mark_done()
+
+        # Measure the uncached path of cached endpoints; clearing the
+        # versions drops the PIN users cached by this process too
+        caches['default'].clear()
+        caches['versions'].clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = call(
+                client, method, fill(path, context), fill(payload, context))
+            elapsed = (perf_counter() - start) * 1000
+
+        if name == 'events token' and response.status_code == 200:
+            context['events_token'] = response.data['token']
+        yield endpoint, response, len(queries), elapsed
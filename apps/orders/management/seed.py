@@ -0,0 +1,145 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from apps.finance.models import Expense
+from apps.finance.models import Income
+from apps.meals.models import Meal
+from apps.finance.models import Expense
+from apps.finance.models import Income
+from apps.meals.models import MealCategory
+from apps.orders.models import Order
+from apps.orders.models import OrderItem
+from apps.orders.models import SalesFact
+from apps.orders.models import TableOccupancy
+from apps.tables.models import Room
+from apps.tables.models import Table
+from apps.users.models import User
+
+
+def isolated_cache():
+    """
+    Gives the benchmark commands, which run on a throwaway database, their
+    own cache, so they neither read nor clear the one the box's workers share.
+    """
+    return override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "benchmark",
+        },
+        "versions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "benchmark-versions",
+        },
+    })
+
+
+@transaction.atomic
+def seed_restaurant(rooms=4, tables=100, meals=500, orders=5000, waitresses=12,
+                    days=90, busy_tables=30, seed=0):
+    """
+    Fills an empty database with a restaurant of the given size for the
+    benchmark commands: rooms and tables, a menu, staff and a history of
+    paid orders spread over the last days, with some tables still busy.
+    Returns the created staff and tables.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    staff = [
+        User(username=f"waitress{n}", first_name="Ofisiant", last_name=str(n),
+             type="waitress")
+        for n in range(waitresses)
+    ]
+    staff += [
+        User(username="captain", first_name="Kapitan", type="captain_waitress"),
+        User(username="admin", first_name="Admin", type="admin"),
+        User(username="owner", first_name="Sahib", type="restaurant"),
+    ]
+    for user in staff:
+        user.set_unusable_password()
+    User.objects.bulk_create(staff)
+    staff = list(User.objects.order_by("id"))
+    waitress_list = [user for user in staff if user.type == "waitress"]
+
+    room_list = Room.objects.bulk_create(
+        [Room(name=f"Zal {n + 1}") for n in range(rooms)])
+    table_list = Table.objects.bulk_create([
+        Table(number=f"M{n + 1}", capacity=4, room=room_list[n % rooms])
+        for n in range(tables)
+    ])
+
+    categories = MealCategory.objects.bulk_create(
+        [MealCategory(name=f"Kateqoriya {n + 1}") for n in range(10)])
+    meal_list = Meal.objects.bulk_create([
+        Meal(
+            name=f"Yemək {n + 1}",
+            category=categories[n % len(categories)],
+            price=Decimal(rng.randint(200, 4000)) / 100,
+        )
+        for n in range(meals)
+    ])
+
+    busy = set(rng.sample(range(tables), min(busy_tables, tables)))
+    order_list = []
+    for n in range(orders):
+        table_index = rng.randrange(tables)
+        order_list.append(Order(
+            table=table_list[table_index],
+            waitress=rng.choice(waitress_list),
+            is_paid=True,
+            is_check_printed=True,
+            is_main=True,
+        ))
+    for table_index in busy:
+        order_list.append(Order(
+            table=table_list[table_index],
+            waitress=rng.choice(waitress_list),
+            is_main=True,
+        ))
+    order_list = Order.objects.bulk_create(order_list, batch_size=1000)
+
+    item_list = []
+    for order in order_list:
+        for meal in rng.sample(meal_list, rng.randint(1, 6)):
+            quantity = rng.randint(1, 3)
+            item_list.append(OrderItem(
+                order=order, meal=meal, quantity=quantity,
+                price=meal.price * quantity,
+            ))
+            order.total_price += meal.price * quantity
+        # bulk_create sets created_at to now, spread the paid history
+        if order.is_paid:
+            order.created_at = now - timedelta(
+                days=rng.randrange(days), minutes=rng.randrange(24 * 60))
+    OrderItem.objects.bulk_create(item_list, batch_size=1000)
+    # Every item gets a creation and an update snapshot in its history
+    OrderItem.history.bulk_history_create(item_list, batch_size=1000)
+    OrderItem.history.bulk_history_create(
+        item_list, batch_size=1000, update=True)
+    Order.objects.bulk_update(
+        order_list, ["created_at", "total_price"], batch_size=1000)
+
+    TableOccupancy.objects.rebuild()
+    SalesFact.objects.rebuild_days(
+        timezone.localdate() - timedelta(days=n) for n in range(days + 1))
+    return staff, table_list
+
+
+def seed_finance(days=30):
+    """Adds an income and an expense for each of the last days."""
+    today = timezone.localdate()
+    Income.objects.bulk_create([
+        Income(amount=Decimal(100 + n), payment_type="cashier",
+               date=today - timedelta(days=n))
+        for n in range(days)
+    ])
+    Expense.objects.bulk_create([
+        Expense(amount=Decimal(40 + n), category="other",
+                date=today - timedelta(days=n))
+        for n in range(days)
+    ])
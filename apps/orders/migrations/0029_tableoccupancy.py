@@ -0,0 +1,55 @@
+# Generated by Django 4.2.15 on 2026-10-18 08:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_table_occupancy(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    TableOccupancy = apps.get_model('orders', 'TableOccupancy')
+
+    occupancies = {}
+    open_orders = Order.objects.filter(
+        is_paid=False, is_deleted=False).order_by('id')
+    for order in open_orders:
+        occupancy = occupancies.setdefault(
+            order.table_id, TableOccupancy(table_id=order.table_id))
+        occupancy.open_total += order.total_price
+        occupancy.open_orders_count += 1
+        if order.is_main and not occupancy.order_id:
+            occupancy.order_id = order.id
+            occupancy.waitress_id = order.waitress_id
+            occupancy.is_check_printed = order.is_check_printed
+
+    TableOccupancy.objects.bulk_create(occupancies.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tables', '0009_alter_room_created_at_alter_table_created_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0028_alter_historicalstatistics_title_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableOccupancy',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True, verbose_name='tarix')),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('table', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='occupancy', serialize=False, to='tables.table', verbose_name='Stol')),
+                ('open_total', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Açıq məbləğ')),
+                ('is_check_printed', models.BooleanField(default=False, verbose_name='Çek çıxarılıb')),
+                ('open_orders_count', models.PositiveIntegerField(default=0, verbose_name='Açıq sifarişlər')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='orders.order', verbose_name='Əsas sifariş')),
+                ('waitress', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Ofisiant')),
+            ],
+            options={
+                'verbose_name': 'Masa vəziyyəti',
+                'verbose_name_plural': 'Masa vəziyyətləri',
+            },
+        ),
+        migrations.RunPython(fill_table_occupancy, migrations.RunPython.noop),
+    ]
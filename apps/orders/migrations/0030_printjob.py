@@ -0,0 +1,39 @@
+# Generated by Django 4.2.15 on 2026-10-18 08:40
+
+import apps.orders.models.print_job
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tables', '0009_alter_room_created_at_alter_table_created_at'),
+        ('orders', '0029_tableoccupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrintJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True, verbose_name='tarix')),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('printer', models.CharField(max_length=255, verbose_name='Printer')),
+                ('kind', models.CharField(choices=[('text', 'Mətn'), ('json', 'JSON')], default='text', max_length=8, verbose_name='Format')),
+                ('payload', models.JSONField(encoder=apps.orders.models.print_job.ReceiptJSONEncoder, verbose_name='Məzmun')),
+                ('order_ids', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Növbədə'), ('sending', 'Göndərilir'), ('done', 'Çap edildi'), ('failed', 'Uğursuz')], db_index=True, default='pending', max_length=16, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Cəhdlər')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Növbəti cəhd')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Xəta')),
+                ('printed_at', models.DateTimeField(blank=True, null=True, verbose_name='Çap tarixi')),
+                ('table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='print_jobs', to='tables.table', verbose_name='Stol')),
+            ],
+            options={
+                'verbose_name': 'Çap işi',
+                'verbose_name_plural': 'Çap növbəsi 🖨️',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.15 on 2026-10-18 08:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meals', '0007_alter_meal_created_at_alter_mealcategory_created_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tables', '0009_alter_room_created_at_alter_table_created_at'),
+        ('orders', '0030_printjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True, verbose_name='Tarix')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Miqdar')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Gəlir')),
+                ('meal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='meals.meal', verbose_name='Məhsul')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tables.room', verbose_name='Zal')),
+                ('table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tables.table', verbose_name='Stol')),
+                ('waitress', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Ofisiant')),
+            ],
+            options={
+                'verbose_name': 'Satış faktı',
+                'verbose_name_plural': 'Satış faktları',
+                'indexes': [models.Index(fields=['date', 'waitress'], name='orders_sale_date_8e633a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'meal', 'waitress', 'table'), name='salesfact_line_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.15 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0031_salesfact'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='historicalorder',
+            index=models.Index(fields=['id', '-history_date', '-history_id'], name='hist_order_id_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historicalorderitem',
+            index=models.Index(fields=['id', '-history_date', '-history_id'], name='hist_orderitem_id_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('is_paid', False)), fields=['table', 'is_main'], name='order_open_table_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['is_paid', 'created_at'], name='order_paid_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['waitress', 'created_at'], name='order_waitress_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'meal'], name='orderitem_order_meal_idx'),
+        ),
+    ]
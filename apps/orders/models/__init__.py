@@ -1,3 +1,6 @@
 from apps.orders.models.order import Order
 from apps.orders.models.order import OrderItem
-from apps.orders.models.statistics import Statistics
\ No newline at end of file
+from apps.orders.models.statistics import Statistics
+from apps.orders.models.occupancy import TableOccupancy
+from apps.orders.models.print_job import PrintJob
+from apps.orders.models.sales_fact import SalesFact
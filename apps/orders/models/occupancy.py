@@ -0,0 +1,139 @@
+from django.db import models
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Sum
+from django.contrib.auth import get_user_model
+
+from apps.commons.models import DateTimeModel
+from apps.orders.models.order import Order
+from apps.tables.events import floor_changed
+from apps.tables.models import Table
+
+
+User = get_user_model()
+
+
+class TableOccupancyManager(models.Manager):
+
+    def refresh(self, *tables):
+        """
+        Recomputes the occupancy rows of the given tables (instances or ids)
+        from their unpaid orders and upserts them in a single statement.
+        Table instances passed in get their cached order state reset.
+        """
+        table_ids = set()
+        for table in tables:
+            if isinstance(table, Table):
+                table.reset_order_state()
+                table_ids.add(table.pk)
+            elif table:
+                table_ids.add(int(table))
+
+        if not table_ids:
+            return
+
+        open_orders = Order.objects.filter(
+            table_id__in=table_ids,
+            is_paid=False
+        )
+        totals = {
+            row["table"]: row
+            for row in open_orders.values("table").annotate(
+                open_total=Sum("total_price"),
+                open_orders_count=Count("id"),
+            )
+        }
+        # The main order of a table is its oldest unpaid main order
+        main_orders = {}
+        for row in open_orders.filter(is_main=True).order_by("-id").values(
+            "id", "table", "waitress", "is_check_printed"
+        ):
+            main_orders[row["table"]] = row
+
+        rows = []
+        for table_id in table_ids:
+            total = totals.get(table_id, {})
+            main_order = main_orders.get(table_id, {})
+            rows.append(self.model(
+                table_id=table_id,
+                order_id=main_order.get("id"),
+                waitress_id=main_order.get("waitress"),
+                is_check_printed=main_order.get("is_check_printed", False),
+                open_total=total.get("open_total") or 0,
+                open_orders_count=total.get("open_orders_count", 0),
+            ))
+
+        self.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["table"],
+            update_fields=[
+                "order",
+                "waitress",
+                "is_check_printed",
+                "open_total",
+                "open_orders_count",
+                "updated_at",
+            ],
+        )
+        floor_changed()
+
+    def add_to_open_total(self, table_id, delta):
+        """Shifts the open total of a table by delta with a single UPDATE."""
+        if not delta:
+            return
+        self.filter(table_id=table_id).update(
+            open_total=F("open_total") + delta
+        )
+        floor_changed()
+
+    def rebuild(self):
+        """Recomputes the occupancy of every table."""
+        self.refresh(*Table.objects.values_list("id", flat=True))
+
+
+class TableOccupancy(DateTimeModel, models.Model):
+    table = models.OneToOneField(
+        Table,
+        primary_key=True,
+        related_name="occupancy",
+        on_delete=models.CASCADE,
+        verbose_name="Stol"
+    )
+    order = models.ForeignKey(
+        Order,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Əsas sifariş"
+    )
+    waitress = models.ForeignKey(
+        User,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Ofisiant"
+    )
+    open_total = models.DecimalField(
+        default=0, max_digits=10, decimal_places=2,
+        verbose_name="Açıq məbləğ"
+    )
+    is_check_printed = models.BooleanField(
+        default=False, verbose_name="Çek çıxarılıb")
+    open_orders_count = models.PositiveIntegerField(
+        default=0, verbose_name="Açıq sifarişlər")
+
+    objects = TableOccupancyManager()
+
+    class Meta:
+        verbose_name = "Masa vəziyyəti"
+        verbose_name_plural = "Masa vəziyyətləri"
+
+    def __str__(self):
+        return f"{self.table} | {self.open_orders_count} açıq sifariş"
+
+    @property
+    def is_busy(self):
+        return self.open_orders_count > 0
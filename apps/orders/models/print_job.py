@@ -0,0 +1,156 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db import transaction
+from django.utils import timezone
+
+from apps.commons.models import DateTimeModel
+from apps.orders.models.occupancy import TableOccupancy
+from apps.orders.models.order import Order
+from apps.tables.models import Table
+
+
+class ReceiptJSONEncoder(DjangoJSONEncoder):
+    """Keeps prices numeric, as the printer bridge expects them."""
+
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return super().default(o)
+
+
+class PrintJobManager(models.Manager):
+
+    def enqueue(self, payload, kind="text", table=None, orders=(), printer=None):
+        """Stores a receipt to be sent by the print worker."""
+        return self.create(
+            printer=printer or settings.PRINTER_URL,
+            kind=kind,
+            payload=payload,
+            table=table,
+            order_ids=[order.id for order in orders],
+        )
+
+    def unfinished(self):
+        return self.filter(status__in=[self.model.PENDING, self.model.SENDING])
+
+    def claim_next(self):
+        """
+        Marks the next due job as sending and returns it, or None.
+
+        Jobs of a printer are sent strictly in the order they were queued:
+        only the oldest unfinished job of each printer may be claimed, so a
+        job waiting for a retry holds back the ones queued after it.
+        """
+        now = timezone.now()
+        heads = self.unfinished().values("printer").annotate(
+            head_id=models.Min("id")
+        ).values_list("head_id", flat=True)
+        candidates = self.filter(
+            id__in=list(heads),
+            status=self.model.PENDING,
+            next_attempt_at__lte=now,
+        ).order_by("next_attempt_at", "id")
+
+        for job in candidates:
+            claimed = self.filter(id=job.id, status=self.model.PENDING).update(
+                status=self.model.SENDING,
+                attempts=models.F("attempts") + 1,
+                updated_at=now,
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+        return None
+
+    def requeue_stale(self, older_than):
+        """Puts back jobs left in sending state by a worker that died."""
+        return self.filter(
+            status=self.model.SENDING,
+            updated_at__lt=timezone.now() - older_than,
+        ).update(status=self.model.PENDING, updated_at=timezone.now())
+
+
+class PrintJob(DateTimeModel, models.Model):
+    PENDING = "pending"
+    SENDING = "sending"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (PENDING, "Növbədə"),
+        (SENDING, "Göndərilir"),
+        (DONE, "Çap edildi"),
+        (FAILED, "Uğursuz"),
+    )
+    KIND_CHOICES = (
+        ("text", "Mətn"),
+        ("json", "JSON"),
+    )
+
+    printer = models.CharField(max_length=255, verbose_name="Printer")
+    kind = models.CharField(
+        max_length=8, choices=KIND_CHOICES, default="text", verbose_name="Format")
+    payload = models.JSONField(
+        encoder=ReceiptJSONEncoder, verbose_name="Məzmun")
+    table = models.ForeignKey(
+        Table,
+        related_name="print_jobs",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Stol"
+    )
+    order_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING,
+        db_index=True, verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Cəhdlər")
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Növbəti cəhd")
+    last_error = models.TextField(blank=True, default="", verbose_name="Xəta")
+    printed_at = models.DateTimeField(
+        blank=True, null=True, verbose_name="Çap tarixi")
+
+    objects = PrintJobManager()
+
+    class Meta:
+        verbose_name = "Çap işi"
+        verbose_name_plural = "Çap növbəsi 🖨️"
+
+    def __str__(self):
+        return f"Print job {self.id} ({self.get_status_display()})"
+
+    def mark_done(self):
+        """Marks the job printed and flags the checks of its orders."""
+        with transaction.atomic():
+            self.status = self.DONE
+            self.printed_at = timezone.now()
+            self.last_error = ""
+            self.save(update_fields=[
+                "status", "printed_at", "last_error", "updated_at"])
+            if self.order_ids:
+                Order.objects.filter(id__in=self.order_ids).update(
+                    is_check_printed=True)
+                TableOccupancy.objects.refresh(self.table_id)
+
+    def mark_failed(self, error):
+        """
+        Schedules a retry with exponential backoff, or gives up once
+        PRINT_JOB_MAX_ATTEMPTS attempts have been made.
+        """
+        self.last_error = str(error)[:1000]
+        if self.attempts >= settings.PRINT_JOB_MAX_ATTEMPTS:
+            self.status = self.FAILED
+        else:
+            delay = min(
+                settings.PRINT_JOB_RETRY_DELAY * 2 ** (self.attempts - 1),
+                settings.PRINT_JOB_MAX_RETRY_DELAY,
+            )
+            self.status = self.PENDING
+            self.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=[
+            "status", "last_error", "next_attempt_at", "updated_at"])
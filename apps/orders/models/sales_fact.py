@@ -0,0 +1,220 @@
+from django.db import IntegrityError
+from django.db import connection
+from django.db import models
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import TruncDate
+from django.contrib.auth import get_user_model
+
+from apps.commons.versions import bump_version
+from apps.commons.versions import get_version
+from apps.meals.models import Meal
+from apps.orders.models.order import OrderItem
+from apps.orders.models.order import local_day_range
+from apps.tables.models import Room
+from apps.tables.models import Table
+
+
+User = get_user_model()
+
+CACHE_VERSION_KEY = "sales-facts:version"
+
+
+class SalesFactManager(models.Manager):
+
+    def lines_of(self, items):
+        """Sums order items per day, meal, waitress and table."""
+        return items.annotate(
+            day=TruncDate("order__created_at")
+        ).values(
+            "day", "meal", "order__waitress", "order__table", "order__table__room"
+        ).annotate(
+            total_quantity=Sum("quantity"),
+            total_revenue=Sum("price"),
+        ).order_by()
+
+    def rebuild_days(self, dates):
+        """
+        Replaces the facts of the given dates with the paid order items of
+        those days, summed per meal, waitress and table. Orders archived by
+        a Z-check still count towards their day. Meant for the backfill;
+        closing tables goes through record_orders.
+        """
+        dates = {date for date in dates if date}
+        if not dates:
+            return 0
+
+        with transaction.atomic():
+            self.lock_for_rebuild()
+            self.filter(date__in=dates).delete()
+            facts = [
+                self.model(
+                    date=row["day"],
+                    meal_id=row["meal"],
+                    waitress_id=row["order__waitress"],
+                    table_id=row["order__table"],
+                    room_id=row["order__table__room"],
+                    quantity=row["total_quantity"] or 0,
+                    revenue=row["total_revenue"] or 0,
+                )
+                for row in self.lines_of(OrderItem.objects.all_order_items().filter(
+                    order__is_paid=True,
+                    order__created_at__range=local_day_range(
+                        min(dates), max(dates)),
+                ))
+                if row["day"] in dates
+            ]
+            self.bulk_create(facts, batch_size=500)
+        bump_version(CACHE_VERSION_KEY)
+        return len(facts)
+
+    def lock_for_rebuild(self):
+        """
+        Keeps closes and other rebuilds from writing facts until the
+        rebuild commits, so the days are read and rewritten as one. On
+        SQLite the DELETE that follows takes the database write lock first.
+        """
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {self.model._meta.db_table} IN SHARE ROW EXCLUSIVE MODE")
+
+    def record_orders(self, order_ids):
+        """
+        Adds the items of newly paid orders to their facts: existing lines
+        grow by the new quantity and revenue in one UPDATE, new lines are
+        inserted. Each order must be recorded once, when it is closed.
+        """
+        lines = {
+            (row["day"], row["meal"], row["order__waitress"], row["order__table"]): row
+            for row in self.lines_of(
+                OrderItem.objects.all_order_items().filter(order_id__in=order_ids))
+        }
+        if not lines:
+            return 0
+
+        for _ in range(3):
+            try:
+                with transaction.atomic():
+                    self._add_lines(lines)
+                break
+            except IntegrityError:
+                # A concurrent close inserted one of the lines first
+                continue
+        else:
+            raise IntegrityError("Could not record the sales facts")
+
+        bump_version(CACHE_VERSION_KEY)
+        return len(lines)
+
+    def _add_lines(self, lines):
+        lookup = Q()
+        for day, meal, waitress, table in lines:
+            lookup |= Q(date=day, meal_id=meal, waitress_id=waitress, table_id=table)
+        existing = {
+            (fact["date"], fact["meal"], fact["waitress"], fact["table"]): fact["id"]
+            for fact in self.filter(lookup).values(
+                "id", "date", "meal", "waitress", "table")
+        }
+
+        if existing:
+            def delta(field, output_field):
+                return Case(
+                    *[
+                        When(id=fact_id, then=Value(lines[key][field]))
+                        for key, fact_id in existing.items()
+                    ],
+                    default=Value(0),
+                    output_field=output_field,
+                )
+
+            self.filter(id__in=existing.values()).update(
+                quantity=F("quantity") + delta(
+                    "total_quantity", models.PositiveIntegerField()),
+                revenue=F("revenue") + delta(
+                    "total_revenue", models.DecimalField(max_digits=12, decimal_places=2)),
+            )
+
+        self.bulk_create([
+            self.model(
+                date=row["day"],
+                meal_id=row["meal"],
+                waitress_id=row["order__waitress"],
+                table_id=row["order__table"],
+                room_id=row["order__table__room"],
+                quantity=row["total_quantity"] or 0,
+                revenue=row["total_revenue"] or 0,
+            )
+            for key, row in lines.items()
+            if key not in existing
+        ])
+
+    def cache_version(self):
+        """Changes whenever facts are rebuilt."""
+        return get_version(CACHE_VERSION_KEY)
+
+    def for_period(self, start, end):
+        return self.filter(date__range=(start, end))
+
+
+class SalesFact(models.Model):
+    date = models.DateField(db_index=True, verbose_name="Tarix")
+    meal = models.ForeignKey(
+        Meal,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Məhsul"
+    )
+    waitress = models.ForeignKey(
+        User,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Ofisiant"
+    )
+    table = models.ForeignKey(
+        Table,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Stol"
+    )
+    room = models.ForeignKey(
+        Room,
+        related_name="+",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name="Zal"
+    )
+    quantity = models.PositiveIntegerField(default=0, verbose_name="Miqdar")
+    revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, verbose_name="Gəlir")
+
+    objects = SalesFactManager()
+
+    class Meta:
+        verbose_name = "Satış faktı"
+        verbose_name_plural = "Satış faktları"
+        constraints = [
+            # Also serves the lookups by date and meal
+            models.UniqueConstraint(
+                fields=["date", "meal", "waitress", "table"],
+                name="salesfact_line_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date", "waitress"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} | {self.meal} x {self.quantity}"
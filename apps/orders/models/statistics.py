@@ -1,71 +1,146 @@
 from django.db import models
+from django.db import transaction
 
 from apps.commons.models import DateTimeModel
+from apps.commons.versions import bump_version
+from apps.commons.versions import get_version
 from django.utils import timezone
 from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.db.models.functions import TruncMonth
 
 from apps.orders.models import Order
+from apps.orders.models.order import local_day_range
+from apps.orders.models.sales_fact import SalesFact
 
 import datetime
 import calendar
 from datetime import timedelta
 
 from simple_history.models import HistoricalRecords
+from simple_history.utils import bulk_create_with_history
+from simple_history.utils import bulk_update_with_history
 
 
 class StatisticsManager(models.Manager):
 
+    def _paid_orders(self):
+        # Orders archived by a Z-check still count towards their day
+        return Order.objects.all_orders().filter(is_paid=True)
+
+    def _save_totals(self, title, totals, waitress_info=False):
+        """
+        Writes totals keyed by date (or by (date, waitress_info) for
+        per_waitress) as statistics of the given title, touching only rows
+        whose total changed. Rows of those dates missing from totals are
+        removed when waitress_info is set.
+        """
+        if not totals:
+            return {}
+
+        dates = {key[0] if waitress_info else key for key in totals}
+        existing = {}
+        for stat in self.filter(title=title, date__in=dates).order_by("id"):
+            key = (stat.date, stat.waitress_info) if waitress_info else stat.date
+            existing.setdefault(key, stat)
+
+        now = timezone.now()
+        to_create, to_update = [], []
+        for key, total in totals.items():
+            stat = existing.get(key)
+            if stat is None:
+                stat = self.model(
+                    title=title,
+                    date=key[0] if waitress_info else key,
+                    waitress_info=key[1] if waitress_info else None,
+                    total=total,
+                )
+                existing[key] = stat
+                to_create.append(stat)
+            elif stat.total != total:
+                stat.total = total
+                stat.updated_at = now
+                to_update.append(stat)
+
+        if to_create:
+            bulk_create_with_history(to_create, self.model)
+        if to_update:
+            bulk_update_with_history(
+                to_update, self.model, ["total", "updated_at"])
+        if waitress_info:
+            stale = [stat.id for key, stat in existing.items()
+                     if key not in totals]
+            if stale:
+                self.filter(id__in=stale).delete()
+        return existing
+
+    @transaction.atomic
+    def rollup_days(self, start, end):
+        """
+        Brings the daily and per-waitress statistics of the days between
+        start and end up to date with one grouped query each. Every day of
+        the range is recomputed; only the rows whose total changed are
+        written.
+        """
+        days = {
+            row["day"]: row["total"]
+            for row in self._paid_orders().filter(
+                created_at__range=local_day_range(start, end)
+            ).annotate(
+                day=TruncDate("created_at")
+            ).values("day").annotate(total=Sum("total_price"))
+            if row["total"]
+        }
+
+        per_waitress = {}
+        for row in self._paid_orders().filter(
+            created_at__range=local_day_range(start, end),
+            waitress__isnull=False,
+        ).annotate(
+            day=TruncDate("created_at")
+        ).values(
+            "day", "waitress",
+            "waitress__username", "waitress__first_name", "waitress__last_name"
+        ).annotate(total=Sum("total_price")):
+            waitress_info = f"{row['waitress__username']} - {row['waitress__first_name']} {row['waitress__last_name']}"
+            key = (row["day"], waitress_info)
+            per_waitress[key] = per_waitress.get(key, 0) + row["total"]
+
+        self._save_totals("per_waitress", per_waitress, waitress_info=True)
+        return self._save_totals("daily", days)
+
+    def rollup_months(self, start, end):
+        """
+        Sums the daily statistics of every month between start and end, the
+        first and the last day of a month, into monthly statistics with one
+        grouped query. Returns the monthly statistics keyed by month.
+        """
+        return self._save_totals("monthly", {
+            row["month"]: row["total"]
+            for row in self.filter(
+                title="daily", date__range=(start, end)
+            ).annotate(
+                month=TruncMonth("date")
+            ).values("month").annotate(total=Sum("total"))
+            if row["total"]
+        })
+
     def calculate_per_waitress(self, date=None):
         if not date:
             # Default to today if no date is provided
             date = timezone.localdate() - timedelta(days=1)
 
-        waitresses_orders = Order.objects.filter(
-            created_at__date=date,
-            is_paid=True,  # Considering only paid orders
-            waitress__isnull=False  # Ensuring orders have an assigned waitress
-        ).values('waitress', 'waitress__username', 'waitress__first_name', 'waitress__last_name').annotate(total_price=Sum('total_price'))
-
-        for order in waitresses_orders:
-            waitress_info = f"{order['waitress__username']} - {order['waitress__first_name']} {order['waitress__last_name']}"
-
-            obj, created = self.update_or_create(
-                title='per_waitress',
-                date=date,
-                waitress_info=waitress_info,
-                defaults={
-                    'total': order['total_price'],
-                }
-            )
+        self.rollup_days(date, date)
 
     def calculate_daily(self, date=None):
         if not date:
             # Default to today if no date is provided
             date = timezone.localdate() - timedelta(days=1)
 
-        self.calculate_per_waitress(date=date)
-
-        existing_stat = self.filter(title='daily', date=date).first()
-        if not existing_stat:
-            start_of_day = timezone.make_aware(
-                datetime.datetime.combine(date, datetime.time.min))
-            end_of_day = timezone.make_aware(
-                datetime.datetime.combine(date, datetime.time.max))
-
-            daily_total = Order.objects.filter(created_at__range=(
-                start_of_day, end_of_day), is_paid=True).aggregate(Sum('total_price'))['total_price__sum'] or 0
-
-            if not daily_total:
-                return
-
-            obj, created = self.update_or_create(
-                title='daily',
-                date=date,
-                defaults={'total': daily_total}
-            )
-
-        return existing_stat or obj
+        return self.rollup_days(date, date).get(date) or self.filter(
+            title="daily", date=date).first()
 
+    @transaction.atomic
     def calculate_monthly(self, date=None):
         if not date:
             # Default to this month if no date is provided
@@ -74,32 +149,20 @@ class StatisticsManager(models.Manager):
         last_day = date.replace(
             day=calendar.monthrange(date.year, date.month)[1])
 
-        for single_date in (first_of_month + datetime.timedelta(days=n) for n in range((last_day - first_of_month).days + 1)):
-            self.calculate_daily(single_date)
-
-        monthly_total = self.filter(title='daily', date__range=[
-                                    first_of_month, last_day]).aggregate(Sum('total'))['total__sum'] or 0
-
-        if not monthly_total:
-            return
-
-        monthly_stat, created = self.update_or_create(
-            title='monthly',
-            date=first_of_month,
-            defaults={'total': monthly_total}
-        )
-        return monthly_stat
+        self.rollup_days(first_of_month, last_day)
+        return self.rollup_months(first_of_month, last_day).get(first_of_month)
 
+    @transaction.atomic
     def calculate_yearly(self, date=None):
         if not date:
             # Default to this year if no date is provided
             date = timezone.localdate() - timedelta(days=1)
         first_of_year = date.replace(month=1, day=1)
-        last_month = date.month
+        last_day = date.replace(
+            day=calendar.monthrange(date.year, date.month)[1])
 
-        for month in range(1, last_month + 1):
-            month_date = first_of_year.replace(month=month)
-            self.calculate_monthly(month_date)
+        self.rollup_days(first_of_year, last_day)
+        self.rollup_months(first_of_year, last_day)
 
         yearly_total = self.filter(title='monthly', date__year=date.year).aggregate(
             Sum('total'))['total__sum'] or 0
@@ -107,12 +170,8 @@ class StatisticsManager(models.Manager):
         if not yearly_total:
             return
 
-        yearly_stat, created = self.update_or_create(
-            title='yearly',
-            date=first_of_year,
-            defaults={'total': yearly_total}
-        )
-        return yearly_stat
+        return self._save_totals(
+            "yearly", {first_of_year: yearly_total})[first_of_year]
 
     def calculate_till_now(self):
         orders = Order.objects.filter(is_paid=True)
@@ -131,10 +190,30 @@ class StatisticsManager(models.Manager):
                 'date': timezone.localdate(),
             }
         )
-        till_now_stat.orders.add(*orders)
+        self.link_orders(till_now_stat, orders)
         till_now_stat.save()
         return till_now_stat
 
+    def link_orders(self, statistic, orders, batch_size=1000):
+        """
+        Links the orders to the statistic by bulk-creating the through rows
+        in chunks, skipping orders already linked, so memory stays flat
+        whatever the size of the order history.
+        """
+        Through = self.model.orders.through
+        order_ids = orders.exclude(statistics=statistic).values_list(
+            "id", flat=True).order_by("id")
+
+        batch = []
+        for order_id in order_ids.iterator(chunk_size=batch_size):
+            batch.append(Through(statistics_id=statistic.id, order_id=order_id))
+            if len(batch) >= batch_size:
+                Through.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            Through.objects.bulk_create(batch, ignore_conflicts=True)
+        statistic.invalidate_reports()
+
     def delete_orders_for_statistics_day(self, date):
         # First check if statistics exist for the day, if not calculate them
         self.calculate_daily(date)
@@ -204,6 +283,17 @@ class Statistics(DateTimeModel, models.Model):
     def save(self, *args, **kwargs):
         return super().save(*args, **kwargs)
 
+    @property
+    def report_cache_version(self):
+        """Changes whenever the orders behind this statistic change."""
+        version = get_version(f"statistics:{self.id}:orders-version")
+        if self.title != "till_now":
+            version = f"{version}.{SalesFact.objects.cache_version()}"
+        return version
+
+    def invalidate_reports(self):
+        bump_version(f"statistics:{self.id}:orders-version")
+
     def delete_orders_till_now(self):
         # Filter and delete all paid orders up to the current date
         orders = self.orders.all()
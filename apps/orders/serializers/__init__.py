@@ -7,4 +7,7 @@ from apps.orders.serializers.orders import OrderSerializer
 from apps.orders.serializers.orders import ListOrderItemSerializer
 from apps.orders.serializers.orders import OrderItemSerializer
 from apps.orders.serializers.orders import OrderItemInputSerializer
+from apps.orders.serializers.orders import OrderItemsInputSerializer
 from apps.orders.serializers.orders import OrderItemOutputSerializer
+
+from apps.orders.serializers.print_jobs import PrintJobSerializer
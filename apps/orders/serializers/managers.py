@@ -2,6 +2,7 @@ from rest_framework import serializers
 from apps.meals.models import Meal
 from apps.orders.models import Order
 from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
 from apps.users.models import User
 
 # from apps.tables.models import Table
@@ -43,14 +44,18 @@ class DeleteOrderItemSerializer(serializers.Serializer):
             raise serializers.ValidationError("Order item not found")
 
         # Decrease quantity or delete if necessary
+        old_price = order_item.price
         new_quantity = order_item.quantity - quantity_to_decrease
         if new_quantity > 0:
             order_item.quantity = new_quantity
             order_item.save()
+            new_price = order_item.price
         else:
             order_item.delete()
-        order.refresh_from_db()
-        order.update_total_price()
+            new_price = 0
+        order.add_to_total_price(new_price - old_price)
+        TableOccupancy.objects.add_to_open_total(
+            order.table_id, new_price - old_price)
 
 
 class ListWaitressSerializer(serializers.ModelSerializer):
@@ -5,6 +5,7 @@ from django.utils import timezone
 from apps.meals.models import Meal
 from apps.orders.models import Order
 from apps.orders.models import OrderItem
+from apps.orders.models import TableOccupancy
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -61,6 +62,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
                 id=self.context['order_id'])
 
             # Attempt to get or create the order item
+            old_price = 0
             order_item, created = OrderItem.objects.get_or_create(
                 meal=meal,
                 order=order,
@@ -73,13 +75,16 @@ class OrderItemSerializer(serializers.ModelSerializer):
             # If the order item was not created, it means it already exists, so update the quantity
             if not created:
                 # Since we're in a transaction block with select_for_update, we can safely update
+                old_price = order_item.price
                 order_item.quantity += quantity
                 order_item.price += meal.price * quantity
                 order_item.item_added_at = timezone.now()
                 order_item.save()
 
-            # Update the total price of the order
-            order.update_total_price()
+            # Shift the total price of the order by the added amount
+            order.add_to_total_price(order_item.price - old_price)
+            TableOccupancy.objects.add_to_open_total(
+                order.table_id, order_item.price - old_price)
 
             # Ensure changes are persisted and visible outside this function
             order_item.refresh_from_db()
@@ -94,6 +99,13 @@ class OrderItemInputSerializer(serializers.Serializer):
         required=True, min_value=1, help_text="Quantity of the meal to order.")
 
 
+class OrderItemsInputSerializer(serializers.Serializer):
+    order_id = serializers.IntegerField(
+        required=False, help_text="ID of the order. Defaults to the main order.")
+    items = OrderItemInputSerializer(
+        many=True, allow_empty=False, help_text="Meals and quantities.")
+
+
 class OrderItemOutputSerializer(serializers.Serializer):
     meal_id = serializers.IntegerField(read_only=True)
     quantity = serializers.IntegerField(read_only=True)
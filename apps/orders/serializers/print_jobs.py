@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from apps.orders.models import PrintJob
+
+
+class PrintJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PrintJob
+        fields = (
+            "id",
+            "table",
+            "status",
+            "attempts",
+            "next_attempt_at",
+            "last_error",
+            "created_at",
+            "printed_at",
+        )
@@ -0,0 +1,21 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from apps.orders.models import Statistics
+
+
+@receiver(m2m_changed, sender=Statistics.orders.through)
+def invalidate_statistics_reports(sender, instance, action, reverse, pk_set, **kwargs):
+    # A cleared relation is caught before clearing, while its rows are known
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        instance.invalidate_reports()
+        return
+
+    # Orders were linked or unlinked from their side
+    statistics = Statistics.objects.filter(
+        id__in=pk_set) if pk_set is not None else instance.statistics.all()
+    for statistic in statistics:
+        statistic.invalidate_reports()
@@ -0,0 +1,33 @@
+from django.test import TestCase
+
+from apps.orders.management.query_budgets import measure_endpoints
+from apps.orders.management.query_budgets import round_context
+from apps.orders.management.query_budgets import staff_client
+from apps.orders.management.seed import isolated_cache
+from apps.orders.management.seed import seed_finance
+from apps.orders.management.seed import seed_restaurant
+
+
+@isolated_cache()
+class QueryBudgetTests(TestCase):
+    """
+    Calls every API endpoint on a seeded restaurant and fails when one
+    needs more queries than its budget in query_budgets.ENDPOINTS. Run
+    check_query_budgets for the latency percentiles.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff, _ = seed_restaurant(orders=3000)
+        seed_finance()
+
+    def test_endpoints_stay_within_their_query_budget(self):
+        client = staff_client(
+            next(user for user in self.staff if user.type == "restaurant"))
+        context = round_context(self.staff)
+        for endpoint, response, queries, _ in measure_endpoints(client, context):
+            name, _, _, _, budget, accepted = endpoint
+            with self.subTest(endpoint=name):
+                self.assertIn(response.status_code, accepted)
+                self.assertLessEqual(
+                    queries, budget, f"{name}: {queries} queries, budget {budget}")
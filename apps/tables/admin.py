@@ -1,8 +1,17 @@
 from django.contrib import admin
-from django.db.models import Sum, F
+from django.db.models import DecimalField
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.db.models import Prefetch
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Concat
 from django.shortcuts import get_object_or_404, render
 from django.urls import path
 from apps.orders.models import Order
+from apps.orders.models import OrderItem
 
 from apps.tables.models import Table
 from apps.tables.models import Room
@@ -53,6 +62,36 @@ admin.site.register(Room)
 
 class CustomTableAdmin(admin.ModelAdmin):
     change_list_template = "admin/tables_changelist.html"
+    list_select_related = ('room',)
+    ordering = ('room', 'number')
+
+    def get_queryset(self, request):
+        """
+        Annotates every table with the state of its unpaid orders, so the
+        floor grid renders without a query per table.
+        """
+        unpaid_orders = Order.objects.filter(
+            table=OuterRef('pk'), is_paid=False)
+        main_order = unpaid_orders.filter(is_main=True).order_by('id')
+        open_total = unpaid_orders.order_by().values('table').annotate(
+            total=Sum('total_price')).values('total')
+
+        return super().get_queryset(request).annotate(
+            has_unpaid_orders=Exists(unpaid_orders),
+            open_total=Coalesce(
+                Subquery(open_total),
+                Value(0),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            ),
+            check_printed=Subquery(
+                main_order.values('is_check_printed')[:1]),
+            waitress_name=Subquery(
+                main_order.annotate(
+                    name=Concat(
+                        'waitress__first_name', Value(' '), 'waitress__last_name')
+                ).values('name')[:1]
+            ),
+        )
 
     def get_urls(self):
         urls = super().get_urls()
@@ -64,11 +103,18 @@ class CustomTableAdmin(admin.ModelAdmin):
 
     def orders_view(self, request, table_id):
         table = get_object_or_404(Table, pk=table_id)
-        orders = Order.objects.filter(table=table, is_paid=False)
-        total_quantity = orders.aggregate(total_quantity=Sum(
-            'order_items__quantity'))['total_quantity'] or 0
-        total_price = orders.aggregate(total_price=Sum(
-            F('order_items__quantity') * F('order_items__price')))['total_price'] or 0
+        orders = list(
+            Order.objects.filter(table=table, is_paid=False).prefetch_related(
+                Prefetch(
+                    'order_items',
+                    queryset=OrderItem.objects.select_related(
+                        'meal').order_by('id')
+                )
+            ).order_by('id')
+        )
+        items = [item for order in orders for item in order.order_items.all()]
+        total_quantity = sum(item.quantity for item in items)
+        total_price = sum(item.price for item in items)
 
         return render(
             request,
@@ -85,11 +131,7 @@ class CustomTableAdmin(admin.ModelAdmin):
         response = super().changelist_view(request, extra_context)
         try:
             cl = response.context_data['cl']
-            cl.result_list = cl.result_list.order_by('room').order_by('number')
             cl.rooms = Room.objects.all()
-            for table in cl.result_list:
-                table.has_unpaid_orders = Order.objects.exclude(
-                    is_deleted=True).filter(table=table, is_paid=False).exists()
         except (AttributeError, KeyError):
             pass
         return response
@@ -1,3 +1,5 @@
 from apps.tables.apis.tables import TableAPIView
 from apps.tables.apis.tables import RoomAPIView
 from apps.tables.apis.tables import TableDetailAPIView
+from apps.tables.apis.events import TableEventsView
+from apps.tables.apis.events import TableEventsTokenAPIView
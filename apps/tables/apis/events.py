@@ -0,0 +1,88 @@
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
+from django.views import View
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.tables.events import table_events
+from apps.users.auth import get_pin_user
+
+User = get_user_model()
+
+STREAM_TOKEN_SALT = "tables.events"
+
+
+def stream_user(request):
+    """
+    EventSource cannot send headers, so besides the X-PIN header a stream
+    token from TableEventsTokenAPIView may come as the `token` parameter;
+    the admin floor grid uses its session.
+    """
+    pin = request.headers.get("X-PIN")
+    token = request.GET.get("token")
+    if pin:
+        user = get_pin_user(pin)
+    elif token:
+        try:
+            user_id = signing.loads(
+                token, salt=STREAM_TOKEN_SALT,
+                max_age=settings.FLOOR_EVENTS_TOKEN_MAX_AGE)
+        except signing.BadSignature:
+            return None
+        user = User.objects.filter(pk=user_id).first()
+    else:
+        user = request.user
+    if user is None or not user.is_authenticated or not user.is_active:
+        return None
+    return user
+
+
+class TableEventsTokenAPIView(APIView):
+    """
+    Issues a token opening a table event stream, valid for
+    FLOOR_EVENTS_TOKEN_MAX_AGE seconds, so the PIN never goes into a URL.
+    Clients fetch a new one before each connection.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({
+            "token": signing.dumps(request.user.pk, salt=STREAM_TOKEN_SALT),
+            "expires_in": settings.FLOOR_EVENTS_TOKEN_MAX_AGE,
+        })
+
+
+class TableEventsView(View):
+    """
+    Pushes the table changes of a room, or of every room, as server-sent
+    events. Needs the ASGI application of config/asgi.py.
+    """
+
+    async def get(self, request, room_id=None):
+        if not isinstance(request, ASGIRequest):
+            # A WSGI server would buffer the endless stream
+            return JsonResponse(
+                {"detail": "Table events need the ASGI server (config.asgi)."},
+                status=501
+            )
+
+        user = await sync_to_async(stream_user)(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=403
+            )
+
+        response = StreamingHttpResponse(
+            table_events(room_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Keeps nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
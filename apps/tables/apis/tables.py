@@ -21,7 +21,9 @@ class TableAPIView(ListAPIView):
 
     def get_queryset(self):
         room_id = self.kwargs.get("room_id", None)
-        return Table.objects.filter(room__id=room_id).order_by("id")
+        return Table.objects.filter(
+            room__id=room_id
+        ).with_floor_state().order_by("id")
 
 
 class RoomAPIView(ListAPIView):
@@ -39,7 +41,9 @@ class RoomAPIView(ListAPIView):
 class TableDetailAPIView(APIView):
 
     def get(self, request, table_id):
-        table = Table.objects.filter(id=table_id).first()
+        table = Table.objects.filter(
+            id=table_id
+        ).with_floor_state().first()
 
         if not table:
             return Response(
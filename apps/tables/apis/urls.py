@@ -2,9 +2,14 @@ from django.urls import path
 from apps.tables.apis import TableAPIView
 from apps.tables.apis import TableDetailAPIView
 from apps.tables.apis import RoomAPIView
+from apps.tables.apis import TableEventsView
+from apps.tables.apis import TableEventsTokenAPIView
 
 urlpatterns = [
     path("<int:room_id>/tables/", TableAPIView.as_view()),
     path("rooms/", RoomAPIView.as_view()),
     path("<int:table_id>/details", TableDetailAPIView.as_view()),
+    path("<int:room_id>/events/", TableEventsView.as_view(), name="room-table-events"),
+    path("events/", TableEventsView.as_view(), name="table-events"),
+    path("events/token/", TableEventsTokenAPIView.as_view(), name="table-events-token"),
 ]
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from apps.commons.versions import bump_version
+from apps.commons.versions import get_version
+from apps.tables.models import Table
+from apps.tables.serializers import TableSerializer
+
+
+FLOOR_VERSION_KEY = "floor:version"
+
+# Streams of this process, woken at once when a change commits here;
+# streams of other workers notice the new version on their next poll
+_streams = set()
+_streams_lock = threading.Lock()
+
+
+def floor_changed():
+    """
+    Tells the table event streams that the floor changed, once the current
+    transaction commits. Costs the writer no query.
+    """
+    transaction.on_commit(_publish)
+
+
+def _publish():
+    bump_version(FLOOR_VERSION_KEY)
+    with _streams_lock:
+        streams = list(_streams)
+    for loop, event in streams:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # The loop of a finished stream
+            pass
+
+
+def floor_version():
+    return get_version(FLOOR_VERSION_KEY)
+
+
+def floor_state(room_id, version):
+    """
+    The serialized tables of a room, or of every room, as of the version.
+    Computed once per version and shared by the streams of the box, which
+    keep one entry per room, replaced when the version changes.
+    """
+    key = f"floor:state:{room_id or 'all'}"
+    cached_version, state = cache.get(key, (None, None))
+    if cached_version != version:
+        tables = Table.objects.with_floor_state().order_by("id")
+        if room_id:
+            tables = tables.filter(room_id=room_id)
+        state = {
+            table["id"]: table
+            for table in json.loads(json.dumps(
+                TableSerializer(tables, many=True).data, cls=DjangoJSONEncoder))
+        }
+        cache.set(key, (version, state), settings.FLOOR_EVENTS_MAX_AGE)
+    return state
+
+
+def server_sent_event(name, version, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"id: {version}\nevent: {name}\ndata: {payload}\n\n"
+
+
+async def table_events(room_id):
+    """
+    Streams the tables of a room as server-sent events: a `snapshot` of
+    every table first, then `tables` events with the tables that changed
+    and the ids of those that left the room. Ends after
+    FLOOR_EVENTS_MAX_AGE seconds; EventSource clients reconnect by
+    themselves, clients using a stream token after fetching a new one.
+    """
+    loop = asyncio.get_running_loop()
+    wake_up = asyncio.Event()
+    stream = (loop, wake_up)
+    with _streams_lock:
+        _streams.add(stream)
+
+    try:
+        yield "retry: 1000\n\n"
+        state, version = None, None
+        deadline = time.monotonic() + settings.FLOOR_EVENTS_MAX_AGE
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            wake_up.clear()
+            current = await sync_to_async(floor_version)()
+            if current != version:
+                tables = await sync_to_async(floor_state)(room_id, current)
+                if state is None:
+                    yield server_sent_event(
+                        "snapshot", current, list(tables.values()))
+                    last_sent = time.monotonic()
+                else:
+                    changed = [
+                        table for table_id, table in tables.items()
+                        if state.get(table_id) != table
+                    ]
+                    removed = [
+                        table_id for table_id in state if table_id not in tables]
+                    if changed or removed:
+                        yield server_sent_event(
+                            "tables", current,
+                            {"tables": changed, "removed": removed})
+                        last_sent = time.monotonic()
+                state, version = tables, current
+
+            if time.monotonic() - last_sent >= settings.FLOOR_EVENTS_KEEPALIVE:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+
+            try:
+                await asyncio.wait_for(
+                    wake_up.wait(), settings.FLOOR_EVENTS_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        with _streams_lock:
+            _streams.discard(stream)
@@ -1,4 +1,6 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.utils.functional import cached_property
 from django.contrib.auth import get_user_model
 
 from apps.commons.models import DateTimeModel
@@ -19,6 +21,17 @@ class Room(DateTimeModel, models.Model):
         return self.name
 
 
+class TableQuerySet(models.QuerySet):
+
+    def with_floor_state(self):
+        """
+        Joins the occupancy row of every table and its waitress, so the
+        floor plan serializes in a single query regardless of how many
+        tables the room has.
+        """
+        return self.select_related("occupancy", "occupancy__waitress")
+
+
 class Table(DateTimeModel, models.Model):
     number = models.CharField(max_length=10, blank=True, null=True)
     capacity = models.IntegerField(blank=True, null=True)
@@ -29,6 +42,8 @@ class Table(DateTimeModel, models.Model):
         null=True
     )
 
+    objects = TableQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Stol"
         verbose_name_plural = "Stollar"
@@ -36,23 +51,75 @@ class Table(DateTimeModel, models.Model):
     def __str__(self):
         return f"{self.number} | Ərazi {self.room.name if self.room else ''} "
 
+    @cached_property
+    def open_orders(self):
+        """
+        Unpaid orders of the table with their waitress, loaded once per
+        instance.
+        """
+        return list(
+            self.current_orders.select_related("waitress").order_by("id")
+        )
+
+    def reset_order_state(self):
+        """
+        Drops the cached order state, so the next access reloads it.
+        Call it after the table's orders have been changed.
+        """
+        self.__dict__.pop("open_orders", None)
+        self._state.fields_cache.pop("occupancy", None)
+
+    def get_open_order(self, order_id=None):
+        """
+        Returns the unpaid order with the given id, or the main order
+        when no id is given.
+        """
+        if not order_id:
+            return self.current_order
+        return next(
+            (
+                order for order in self.open_orders
+                if str(order.id) == str(order_id)
+            ),
+            None
+        )
+
+    @property
+    def occupancy_state(self):
+        """
+        Denormalized occupancy row maintained by the order endpoints,
+        or None if it has never been written for this table.
+        """
+        try:
+            return self.occupancy
+        except ObjectDoesNotExist:
+            return None
+
     @property
     def waitress(self) -> User:
-        order = self.current_order
-        if order:
-            return order.waitress
+        occupancy = self.occupancy_state
+        if occupancy and occupancy.waitress_id:
+            return occupancy.waitress
         return User.objects.none()
 
     @property
     def total_price(self):
-        price = 0
-        for order in self.current_orders:
-            price += order.total_price
-        return price
+        occupancy = self.occupancy_state
+        if occupancy and occupancy.open_orders_count:
+            return occupancy.open_total
+        return 0
+
+    @property
+    def is_check_printed(self):
+        occupancy = self.occupancy_state
+        return bool(occupancy and occupancy.is_check_printed)
 
     @property
     def current_order(self):
-        return self.orders.filter(is_paid=False, is_main=True).first()
+        return next(
+            (order for order in self.open_orders if order.is_main),
+            None
+        )
 
     @property
     def current_orders(self):
@@ -60,7 +127,8 @@ class Table(DateTimeModel, models.Model):
 
     @property
     def assignable_table(self):
-        return not self.orders.filter(is_paid=False).exists()
+        occupancy = self.occupancy_state
+        return not (occupancy and occupancy.open_orders_count)
 
     def can_print_check(self):
         """
@@ -33,7 +33,7 @@ class TableSerializer(serializers.ModelSerializer):
         }
 
     def get_print_check(self, obj: Table):
-        return obj.current_order.is_check_printed if obj.current_order else False
+        return obj.is_check_printed
 
 
 class TableDetailSerializer(serializers.ModelSerializer):
@@ -65,7 +65,7 @@ class TableDetailSerializer(serializers.ModelSerializer):
         }
 
     def get_print_check(self, obj: Table):
-        return obj.current_order.is_check_printed if obj.current_order else False
+        return obj.is_check_printed
 
 
 class RoomSerializer(serializers.ModelSerializer):
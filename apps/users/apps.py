@@ -5,3 +5,7 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = "İstifadəçi"
+
+    def ready(self) -> None:
+        import apps.users.signals
+        return super().ready()
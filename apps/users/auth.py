@@ -1,8 +1,83 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework import authentication, exceptions
 
+from apps.commons.versions import bump_version
+from apps.commons.versions import get_version
+
 User = get_user_model()
 
+SHARED_CACHE_KEY = "pin-auth:{}"
+VERSION_KEY = "pin-auth:version"
+
+_pin_users = {}
+_pin_users_lock = threading.Lock()
+
+
+def auth_version():
+    """
+    Changes whenever a user is saved or deleted. Every process compares it
+    with the version its local entries were cached under, so a user changed
+    through one worker is dropped by all of them.
+    """
+    return get_version(VERSION_KEY)
+
+
+def get_pin_user(pin):
+    """
+    Returns the user of a PIN, or None. Users are kept in a process-local
+    cache for PIN_AUTH_CACHE_TIMEOUT seconds and, with PIN_AUTH_SHARED_CACHE,
+    in the shared cache as well. A local hit costs one cache read of the
+    auth version and no query.
+    """
+    now = time.monotonic()
+    version = auth_version()
+    with _pin_users_lock:
+        cached = _pin_users.get(pin)
+    if cached and cached[1] > now and cached[2] == version:
+        # Each request gets its own copy to change as it likes
+        return copy.copy(cached[0])
+
+    user = None
+    if settings.PIN_AUTH_SHARED_CACHE:
+        user = cache.get(SHARED_CACHE_KEY.format(pin))
+    if user is None:
+        user = User.objects.filter(username=pin).first()
+        if user is None:
+            return None
+        if settings.PIN_AUTH_SHARED_CACHE:
+            cache.set(SHARED_CACHE_KEY.format(pin), user,
+                      settings.PIN_AUTH_CACHE_TIMEOUT)
+
+    with _pin_users_lock:
+        _pin_users[pin] = (
+            user, now + settings.PIN_AUTH_CACHE_TIMEOUT, version)
+    return copy.copy(user)
+
+
+def forget_pin_user(user, *pins):
+    """
+    Drops a user from the PIN caches, under its current PIN, the given
+    former PINs and any other PIN it is cached under in this process, and
+    bumps the auth version so other processes drop their local copies.
+    """
+    with _pin_users_lock:
+        stale = {
+            pin for pin, (cached, _, _) in _pin_users.items()
+            if cached.pk == user.pk
+        }
+        stale.update(pin for pin in (user.username, *pins) if pin)
+        for pin in stale:
+            _pin_users.pop(pin, None)
+    if settings.PIN_AUTH_SHARED_CACHE:
+        cache.delete_many([SHARED_CACHE_KEY.format(pin) for pin in stale])
+    bump_version(VERSION_KEY)
+
 
 class PINAuthentication(authentication.BaseAuthentication):
     def authenticate(self, request):
@@ -10,13 +85,10 @@ class PINAuthentication(authentication.BaseAuthentication):
         if not pin:
             return None
 
-        try:
-            user = User.objects.get(username=pin)
-            if not user.is_active:
-                raise exceptions.AuthenticationFailed(
-                    'User account is inactive')
-            return (user, None)
-        except User.DoesNotExist:
+        user = get_pin_user(pin)
+        if user is None:
             raise exceptions.AuthenticationFailed('No such user')
-
-        return None
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                'User account is inactive')
+        return (user, None)
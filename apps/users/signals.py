@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_init
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.users.auth import forget_pin_user
+from apps.users.models import User
+
+# The fields PIN authentication depends on; the PIN is the username
+PIN_FIELDS = ("username", "is_active", "type")
+
+
+def pin_state(instance: User):
+    # Read from __dict__ so deferred fields are not loaded
+    return {field: instance.__dict__.get(field) for field in PIN_FIELDS}
+
+
+@receiver(post_init, sender=User)
+def remember_pin_state(sender, instance: User, *args, **kwargs):
+    instance._pin_state = pin_state(instance)
+
+
+@receiver(post_save, sender=User)
+def forget_changed_pin(sender, instance: User, created, update_fields=None, *args, **kwargs):
+    if created or (
+            update_fields is not None and not set(update_fields) & set(PIN_FIELDS)):
+        # No cached PIN can be stale, e.g. after a login only set last_login
+        return
+
+    previous, current = instance._pin_state, pin_state(instance)
+    instance._pin_state = current
+    if previous != current:
+        forget_pin_user(instance, previous["username"])
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_pin(sender, instance: User, *args, **kwargs):
+    forget_pin_user(instance)
@@ -12,7 +12,10 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 
 import os
+import tempfile
 from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -215,13 +218,90 @@ CORS_ALLOW_HEADERS = [
 ]
 
 
+# Cache shared by every worker of the box, so cached pages are filled once
+# and invalidated everywhere:
+#   file   - files under CACHE_LOCATION (default)
+#   db     - the cache_table of the default database, created by
+#            `python manage.py createcachetable`
+#   redis  - a Redis-compatible server at CACHE_LOCATION, e.g. redis-server
+#            or valkey-server started locally with default options
+#   locmem - one cache per process, for development only
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file")
+CACHE_BACKENDS = {
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(tempfile.gettempdir(), 'kazza-cache'),
+    ),
+    'db': (
+        'django.core.cache.backends.db.DatabaseCache',
+        'cache_table',
+    ),
+    'redis': (
+        'django.core.cache.backends.redis.RedisCache',
+        'redis://127.0.0.1:6379/0',
+    ),
+    'locmem': (
+        'django.core.cache.backends.locmem.LocMemCache',
+        '',
+    ),
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}")
+
+CACHE_LOCATION = os.environ.get(
+    "CACHE_LOCATION", CACHE_BACKENDS[CACHE_BACKEND][1])
+CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "kazza")
+# Past MAX_ENTRIES the file, db and locmem caches drop a third of their
+# entries on the next write
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 20000))
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': CACHE_LOCATION,
+        'KEY_PREFIX': CACHE_KEY_PREFIX,
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    # The menu, floor, report and PIN versions, kept apart from the cached
+    # pages so culling those never drops a version. Holds a few keys per
+    # statistic; a Redis server should use a volatile-* maxmemory-policy,
+    # which never evicts these keys as they do not expire.
+    'versions': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': {
+            'file': CACHE_LOCATION + '-versions',
+            'db': CACHE_LOCATION + '_versions',
+            'redis': CACHE_LOCATION,
+            'locmem': 'versions',
+        }[CACHE_BACKEND],
+        'KEY_PREFIX': CACHE_KEY_PREFIX + '-versions',
+        'OPTIONS': {'MAX_ENTRIES': 10 * CACHE_MAX_ENTRIES},
+    },
 }
 
 CACHE_TIME_IN_SECONDS = 150
+# Menu lists are cached per menu version, which changes with every meal or
+# category edit, so they may stay cached for long
+MENU_CACHE_TIME_IN_SECONDS = 60 * 60 * 24
+
+# Table event streams, served by config/asgi.py. Streams of other workers
+# see a change after at most the poll interval; a stream ends after
+# FLOOR_EVENTS_MAX_AGE seconds and its client reconnects.
+FLOOR_EVENTS_POLL_INTERVAL = float(
+    os.environ.get("FLOOR_EVENTS_POLL_INTERVAL", 0.5))
+FLOOR_EVENTS_KEEPALIVE = 15
+FLOOR_EVENTS_MAX_AGE = 300
+# Stream tokens only open a stream, so they may expire soon after
+FLOOR_EVENTS_TOKEN_MAX_AGE = 60
+REPORT_CACHE_TIME_IN_SECONDS = 60 * 60 * 24
+
+# Seconds a PIN stays cached by PINAuthentication. Saving a user drops it
+# from every process at once, through the auth version in the cache.
+PIN_AUTH_CACHE_TIMEOUT = int(os.environ.get("PIN_AUTH_CACHE_TIMEOUT", 300))
+PIN_AUTH_SHARED_CACHE = os.environ.get(
+    "PIN_AUTH_SHARED_CACHE", "0" if CACHE_BACKEND == "locmem" else "1"
+).lower() in ("1", "true", "yes")
 
 LOGGING = {
     'version': 1,
@@ -254,6 +334,13 @@ PRINTER_SERVICE = os.environ.get(
     "PRINTER_SERVICE",
     None
 )
+# Seconds to wait for the printer bridge before giving up on a request
+PRINTER_TIMEOUT = int(os.environ.get("PRINTER_TIMEOUT", 10))
+
+# Print queue, drained by `python manage.py print_worker`
+PRINT_JOB_MAX_ATTEMPTS = int(os.environ.get("PRINT_JOB_MAX_ATTEMPTS", 5))
+PRINT_JOB_RETRY_DELAY = int(os.environ.get("PRINT_JOB_RETRY_DELAY", 5))
+PRINT_JOB_MAX_RETRY_DELAY = 300
 
 JAZZMIN_SETTINGS = {
     "site_title": "KAZZA Admin",